@@ -0,0 +1,117 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, List
+
+# Lower value = served first
+PRIORITY_ONGOING = 0
+PRIORITY_NEW = 1
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries a Retry-After hint in seconds"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """Bounded concurrency with a small priority queue and a queue deadline.
+
+    Up to max_concurrency requests run at once; up to max_queue more wait,
+    ongoing conversations ahead of new ones. A request that cannot queue, or
+    waits longer than queue_timeout, is rejected so the client can retry
+    instead of timing out on work the server would do anyway.
+    """
+
+    def __init__(self, max_concurrency: int = 8, max_queue: int = 32, queue_timeout: float = 5.0):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: List[tuple] = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        # Exponentially weighted service time, used for Retry-After
+        self._avg_service_seconds = 1.0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.max_queue_depth = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def _retry_after(self) -> int:
+        backlog = self.queue_depth + self.active
+        return max(1, math.ceil(backlog * self._avg_service_seconds / self.max_concurrency))
+
+    def _reject_full(self, priority: int):
+        """Make room for a higher-priority request by evicting the lowest-priority waiter"""
+        pending = [entry for entry in self._waiters if not entry[2].done()]
+        if pending:
+            worst = max(pending, key=lambda entry: (entry[0], entry[1]))
+            if worst[0] > priority:
+                worst[2].set_exception(AdmissionRejected("queue full", self._retry_after()))
+                self.rejected_queue_full += 1
+                return
+        self.rejected_queue_full += 1
+        raise AdmissionRejected("queue full", self._retry_after())
+
+    async def _wait_for_slot(self, priority: int):
+        if self.queue_depth >= self.max_queue:
+            self._reject_full(priority)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            await asyncio.wait_for(future, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise AdmissionRejected("queue deadline exceeded", self._retry_after())
+
+    def _release(self):
+        # Hand the slot straight to the best live waiter, if any
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def admit(self, priority: int = PRIORITY_NEW):
+        if self.active < self.max_concurrency and self.queue_depth == 0:
+            self.active += 1
+        else:
+            await self._wait_for_slot(priority)
+        self.admitted += 1
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            yield
+        finally:
+            elapsed = loop.time() - start
+            self._avg_service_seconds = 0.8 * self._avg_service_seconds + 0.2 * elapsed
+            self._release()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "active": self.active,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_service_seconds": round(self._avg_service_seconds, 3),
+        }
+
+chat_admission = AdmissionController(
+    max_concurrency=int(os.getenv("CHAT_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("CHAT_MAX_QUEUE", "32")),
+    queue_timeout=float(os.getenv("CHAT_QUEUE_TIMEOUT_SECONDS", "5"))
+)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Import-time and cold-start benchmark for the backend.
+
+Each run starts a fresh interpreter so module caches do not hide the cost
+of a worker restart. Usage:
+
+    python bench_startup.py [--runs 5] [--importtime]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import main
+print(time.perf_counter() - start)
+"""
+
+COLD_START_SNIPPET = """
+import time
+start = time.perf_counter()
+import main
+from warmup import warm_up
+warm_up()
+print(time.perf_counter() - start)
+"""
+
+def run_snippet(snippet: str) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    # The timing is the last line; anything before it is startup logging
+    return float(result.stdout.strip().splitlines()[-1]) * 1000
+
+def report(label: str, samples):
+    print(f"{label:<12} median={statistics.median(samples):8.1f}ms  "
+          f"min={min(samples):8.1f}ms  max={max(samples):8.1f}ms")
+
+def show_importtime(top: int = 15):
+    """Print the slowest modules imported by main (cumulative, in ms)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    rows.sort(reverse=True)
+    print(f"\nTop {top} imports by cumulative time:")
+    for cumulative_us, name in rows[:top]:
+        print(f"{cumulative_us / 1000:8.1f}ms  {name}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true", help="also show per-module import cost")
+    args = parser.parse_args()
+
+    report("import", [run_snippet(IMPORT_SNIPPET) for _ in range(args.runs)])
+    report("cold start", [run_snippet(COLD_START_SNIPPET) for _ in range(args.runs)])
+
+    if args.importtime:
+        show_importtime()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+from database import Product
+from models import ProductResponse
+from facets import get_facet_engine
+from product_snapshot import ProductSnapshot, SnapshotWatcher, REQUIRED_COLUMNS
+
+class SnapshotProducts(Sequence):
+    """Lazy ProductResponse view over a memory-mapped snapshot; rows are built on access"""
+
+    def __init__(self, snapshot: ProductSnapshot):
+        self.snapshot = snapshot
+
+    def __len__(self) -> int:
+        return len(self.snapshot)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return ProductResponse(**self.snapshot.row(index))
+
+class ProductCatalog:
+    """Product catalog for this worker.
+
+    When PRODUCT_SNAPSHOT_PATH points at a snapshot file the catalog is served
+    from that shared memory mapping and hot-swapped when a newer file lands;
+    otherwise the product table is copied into memory once per worker.
+    """
+
+    def __init__(self, snapshot_path: Optional[str] = None, check_interval: float = 2.0):
+        self._products: Optional[List[ProductResponse]] = None
+        self._by_id: Dict[int, ProductResponse] = {}
+        self._lock = threading.Lock()
+        self._version = 0
+        self._watcher = (SnapshotWatcher(snapshot_path, check_interval, on_load=self._prepare_snapshot)
+                         if snapshot_path else None)
+
+    @property
+    def snapshot(self) -> Optional[ProductSnapshot]:
+        return self._watcher.current() if self._watcher else None
+
+    @property
+    def version(self) -> int:
+        snapshot = self.snapshot
+        return snapshot.version if snapshot is not None else self._version
+
+    @property
+    def loaded(self) -> bool:
+        return self.snapshot is not None or self._products is not None
+
+    def start_watching(self):
+        """Check for new snapshots in the background instead of on requests"""
+        if self._watcher:
+            self._watcher.start()
+
+    def stop_watching(self):
+        if self._watcher:
+            self._watcher.stop()
+
+    @staticmethod
+    def _prepare_snapshot(snapshot: ProductSnapshot):
+        # Build the search indexes before the new version is handed out
+        get_facet_engine(SnapshotProducts(snapshot), snapshot.version)
+
+    def load(self, db: Session) -> int:
+        """(Re)load the catalog and return the number of products"""
+        snapshot = self.snapshot
+        if snapshot is not None:
+            return len(snapshot)
+        # Same rule as product_snapshot.write_snapshot: rows missing REQUIRED_COLUMNS are not servable
+        rows = (db.query(Product)
+                .filter(*(getattr(Product, name).isnot(None) for name in REQUIRED_COLUMNS),
+                        Product.name != "", Product.category != "")
+                .order_by(Product.id)
+                .all())
+        products = [product_to_response(p) for p in rows]
+        with self._lock:
+            self._products = products
+            self._by_id = {p.id: p for p in products}
+            self._version += 1
+        return len(products)
+
+    def products(self, db: Session) -> Sequence[ProductResponse]:
+        snapshot = self.snapshot
+        if snapshot is not None:
+            return SnapshotProducts(snapshot)
+        if self._products is None:
+            self.load(db)
+        return self._products
+
+    def current(self, db: Session) -> Tuple[Sequence[ProductResponse], int]:
+        """Products and their version, taken from the same snapshot so positions match the version"""
+        snapshot = self.snapshot
+        if snapshot is not None:
+            return SnapshotProducts(snapshot), snapshot.version
+        if self._products is None:
+            self.load(db)
+        with self._lock:
+            return self._products, self._version
+
+    def get(self, db: Session, product_id: int) -> Optional[ProductResponse]:
+        snapshot = self.snapshot
+        if snapshot is not None:
+            index = snapshot.find(product_id)
+            return ProductResponse(**snapshot.row(index)) if index is not None else None
+        if self._products is None:
+            self.load(db)
+        return self._by_id.get(product_id)
+
+def product_to_response(p: Product) -> ProductResponse:
+    return ProductResponse(
+        id=p.id,
+        name=p.name,
+        category=p.category,
+        price=p.price,
+        ram=p.ram,
+        storage=p.storage,
+        weight=p.weight,
+        screen_size=p.screen_size,
+        processor=p.processor,
+        graphics=p.graphics,
+        battery_life=p.battery_life,
+        use_case=p.use_case,
+        # Rows written outside the ORM (e.g. the ETL) may leave these NULL
+        upgradable_ram=bool(p.upgradable_ram),
+        upgradable_storage=bool(p.upgradable_storage),
+        description=p.description,
+        image_url=p.image_url,
+        brand=p.brand,
+        price_minor=p.price_minor,
+        price_bucket=p.price_bucket
+    )
+
+product_catalog = ProductCatalog(
+    snapshot_path=os.getenv("PRODUCT_SNAPSHOT_PATH"),
+    check_interval=float(os.getenv("PRODUCT_SNAPSHOT_CHECK_SECONDS", "2"))
+)
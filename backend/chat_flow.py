@@ -0,0 +1,89 @@
+from sqlalchemy.orm import Session
+from models import ChatMessage, ChatResponse
+from services import ProductService, SessionService
+from conversation import ConversationService
+from llm_provider import get_llm_service
+from catalog import product_catalog
+from facets import get_facet_engine
+from currency import budget_minor
+
+def run_chat_turn(db: Session, message: ChatMessage, llm_service=None, commit: bool = True) -> ChatResponse:
+    """Run one conversation turn: extract slots, persist memory, then ask or recommend.
+
+    With commit=False writes are only flushed and the caller owns the transaction.
+    """
+    # Initialize services
+    session_service = SessionService(db, commit=commit)
+    product_service = ProductService(db)
+    conversation_service = ConversationService(db, commit=commit)
+
+    # LLM service is resolved once per process from GOOGLE_API_KEY unless one is passed in
+    current_llm_service = llm_service or get_llm_service()
+
+    # Get or create session memory
+    current_memory = session_service.get_or_create_session(message.session_id)
+
+    # Bounded prior context: truncated earlier turns plus the last few turns
+    context = conversation_service.build_context(message.session_id)
+
+    # Extract information from user message
+    updated_memory = current_llm_service.extract_information(
+        message.message, current_memory, context=context, session_id=message.session_id
+    )
+
+    # Convert the budget to canonical minor units once per change rather than on every query
+    if updated_memory.budget != current_memory.budget:
+        updated_memory.budget_minor = budget_minor(updated_memory.budget)
+
+    # Update session in database
+    session_service.update_session(message.session_id, updated_memory)
+
+    # Facet counts over the catalog: how many products still match and what to ask next
+    facet_engine = get_facet_engine(*product_catalog.current(db))
+    candidate_mask = facet_engine.candidates(updated_memory)
+
+    # Check if we should recommend products
+    should_recommend = session_service.should_recommend_products(updated_memory, candidate_mask.bit_count())
+
+    if should_recommend:
+        # Search for products
+        products = product_service.search_products(updated_memory)
+        recommended_products = [product.dict() for product in products]
+
+        # Generate response with product recommendations
+        reply = current_llm_service.generate_response(
+            message.message,
+            updated_memory,
+            recommended_products,
+            context=context,
+            session_id=message.session_id
+        )
+        _record_turn(conversation_service, message, reply, recommended_products)
+
+        return ChatResponse(
+            reply=reply,
+            session_id=message.session_id,
+            needs_more_info=False,
+            recommended_products=recommended_products
+        )
+
+    # Generate response asking for more information
+    next_slot = facet_engine.best_next_slot(updated_memory, candidate_mask)
+    reply = current_llm_service.generate_response(
+        message.message, updated_memory, context=context, session_id=message.session_id, next_slot=next_slot
+    )
+    _record_turn(conversation_service, message, reply)
+
+    return ChatResponse(
+        reply=reply,
+        session_id=message.session_id,
+        needs_more_info=True,
+        recommended_products=[]
+    )
+
+def _record_turn(conversation_service: ConversationService, message: ChatMessage, reply: str, products=None):
+    if products:
+        # Keep the listed names so later turns can refer to "the second one"
+        names = "; ".join(f"{i}. {p['name']}" for i, p in enumerate(products, start=1))
+        reply = f"{reply}\n[Recommended: {names}]"
+    conversation_service.append_turns(message.session_id, [("user", message.message), ("assistant", reply)])
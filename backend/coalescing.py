@@ -0,0 +1,98 @@
+import asyncio
+import hashlib
+import json
+import math
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+from models import SlotMemory
+from admission import AdmissionRejected
+
+def memory_fingerprint(memory: SlotMemory) -> str:
+    """Stable hash of a SlotMemory, used to key in-flight chat turns"""
+    payload = json.dumps(memory.dict(), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one in-flight call.
+
+    The first caller for a key runs the coroutine; callers arriving while it
+    is still running await the same result instead of repeating the work.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Return (result, shared) where shared is True if another call produced the result"""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.shared += 1
+            # Shield so a follower disconnecting does not cancel the leader's work
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.calls += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting on it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._inflight), "calls": self.calls, "shared": self.shared}
+
+class SessionLocks:
+    """Per-session FIFO locks so turns from one session are applied in arrival order.
+
+    At most max_pending turns per session may hold or wait for the lock, and a
+    waiter gives up after timeout seconds; both raise AdmissionRejected so the
+    client backs off like any other shed request.
+    """
+
+    def __init__(self, max_pending: int = 4, timeout: float = 30.0):
+        self.max_pending = max_pending
+        self.timeout = timeout
+        # session_id -> [lock, number of holders and waiters]
+        self._locks: Dict[str, List[Any]] = {}
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def hold(self, session_id: str):
+        entry = self._locks.get(session_id)
+        if entry is None:
+            entry = self._locks[session_id] = [asyncio.Lock(), 0]
+        if entry[1] >= self.max_pending:
+            self.rejected += 1
+            raise AdmissionRejected("too many pending turns for session", math.ceil(self.timeout / self.max_pending))
+        entry[1] += 1
+        try:
+            try:
+                await asyncio.wait_for(entry[0].acquire(), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise AdmissionRejected("session turn deadline exceeded", math.ceil(self.timeout / self.max_pending))
+            try:
+                yield
+            finally:
+                entry[0].release()
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                # Drop idle locks so the map only holds active sessions
+                del self._locks[session_id]
+
+    def __len__(self) -> int:
+        return len(self._locks)
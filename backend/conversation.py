@@ -0,0 +1,106 @@
+import os
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from database import ChatSession, ChatTurn
+from usage import estimate_tokens
+
+# Verbatim turns kept in the prompt; older turns move to the truncated earlier-turns transcript
+CONTEXT_RECENT_TURNS = int(os.getenv("CONTEXT_RECENT_TURNS", "6"))
+# Upper bound on the whole context block (earlier turns + recent turns)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "600"))
+EARLIER_TURNS_TOKEN_BUDGET = int(os.getenv("EARLIER_TURNS_TOKEN_BUDGET", "200"))
+# Longest single line kept per turn, in characters
+TURN_CHAR_LIMIT = 400
+EARLIER_TURN_CHAR_LIMIT = 120
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+def _render_turn(turn: ChatTurn, limit: int) -> str:
+    speaker = "User" if turn.role == "user" else "Assistant"
+    return f"{speaker}: {_clip(turn.content or '', limit)}"
+
+class ConversationService:
+    """Per-session turn log with a bounded prompt context window.
+
+    Turns that leave the recent window are kept as a clipped transcript (not a
+    summary): once it exceeds EARLIER_TURNS_TOKEN_BUDGET its oldest lines are
+    dropped. Stated preferences survive regardless because they live in the
+    slot memory, which every prompt includes.
+    """
+
+    def __init__(self, db: Session, commit: bool = True):
+        self.db = db
+        # commit=False only flushes, leaving the transaction to the caller (see replay.py)
+        self.commit = commit
+        self._rows: Dict[str, ChatSession] = {}
+
+    def append_turn(self, session_id: str, role: str, content: str):
+        """Record a turn and move anything older than the recent window to the earlier-turns transcript"""
+        self.append_turns(session_id, [(role, content)])
+
+    def append_turns(self, session_id: str, turns: List[Tuple[str, str]]):
+        """Record several (role, content) turns with a single trim and commit"""
+        for role, content in turns:
+            self.db.add(ChatTurn(session_id=session_id, role=role, content=content))
+        self.db.flush()
+        self._truncate_old_turns(session_id)
+        if self.commit:
+            self.db.commit()
+        else:
+            self.db.flush()
+
+    def build_context(self, session_id: str) -> str:
+        """Earlier-turns transcript plus the most recent turns, trimmed to CONTEXT_TOKEN_BUDGET"""
+        session = self._get_session(session_id)
+        if session is None:
+            return ""
+        earlier = session.summary or ""
+        turns = self._unsummarized_turns(session)[-CONTEXT_RECENT_TURNS:]
+        lines = [_render_turn(turn, TURN_CHAR_LIMIT) for turn in turns]
+
+        budget = CONTEXT_TOKEN_BUDGET - estimate_tokens(earlier)
+        # Drop the oldest verbatim turns first if the window is over budget
+        while lines and sum(estimate_tokens(line) for line in lines) > budget:
+            lines.pop(0)
+
+        parts = []
+        if earlier:
+            parts.append(f"Earlier turns (truncated, oldest omitted):\n{earlier}")
+        if lines:
+            parts.append("Recent turns:\n" + "\n".join(lines))
+        return "\n".join(parts)
+
+    def _get_session(self, session_id: str) -> Optional[ChatSession]:
+        # Cached for the life of this (per-request) service: build_context and append_turns share the row
+        session = self._rows.get(session_id)
+        if session is None:
+            session = self.db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
+            if session is not None:
+                self._rows[session_id] = session
+        return session
+
+    def _unsummarized_turns(self, session: ChatSession) -> List[ChatTurn]:
+        return (self.db.query(ChatTurn)
+                .filter(ChatTurn.session_id == session.session_id,
+                        ChatTurn.id > (session.summarized_through or 0))
+                .order_by(ChatTurn.id)
+                .all())
+
+    def _truncate_old_turns(self, session_id: str):
+        session = self._get_session(session_id)
+        if session is None:
+            return
+        turns = self._unsummarized_turns(session)
+        overflow = turns[:-CONTEXT_RECENT_TURNS] if len(turns) > CONTEXT_RECENT_TURNS else []
+        if not overflow:
+            return
+
+        # Incremental: only the turns leaving the window are added, as clipped lines
+        lines = (session.summary or "").splitlines()
+        lines.extend(_render_turn(turn, EARLIER_TURN_CHAR_LIMIT) for turn in overflow)
+        while len(lines) > 1 and sum(estimate_tokens(line) for line in lines) > EARLIER_TURNS_TOKEN_BUDGET:
+            lines.pop(0)
+        session.summary = "\n".join(lines)
+        session.summarized_through = overflow[-1].id
@@ -0,0 +1,53 @@
+import bisect
+import json
+import os
+from typing import Dict, Optional
+
+# Prices are compared in one canonical currency, stored as integer minor units
+CANONICAL_CURRENCY = os.getenv("CANONICAL_CURRENCY", "USD")
+
+# Currency of Product.price as written by the loaders (seed data and the demo DB are in dollars)
+PRODUCT_CURRENCY = os.getenv("PRODUCT_CURRENCY", "USD")
+
+# SlotMemory.budget is extracted in dollars
+BUDGET_CURRENCY = os.getenv("BUDGET_CURRENCY", "USD")
+
+MINOR_DIGITS = {"USD": 2, "EUR": 2, "VND": 0, "JPY": 0}
+
+# Dollars per unit of each currency; override with CURRENCY_RATES_PATH (a JSON object in the same shape)
+DEFAULT_RATES = {"USD": 1.0, "EUR": 1.08, "VND": 0.0000394, "JPY": 0.0067}
+
+# Upper edges (dollars) of the precomputed price buckets
+PRICE_BUCKET_EDGES = [500, 800, 1200, 1800, 2500]
+
+def load_rates(path: Optional[str] = None) -> Dict[str, float]:
+    """Local rate table; no network lookups on the request path"""
+    rates = dict(DEFAULT_RATES)
+    path = path or os.getenv("CURRENCY_RATES_PATH")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            rates.update({code.upper(): float(rate) for code, rate in json.load(f).items()})
+    return rates
+
+RATES = load_rates()
+
+def to_minor(amount: Optional[float], currency: str) -> Optional[int]:
+    """Convert an amount in currency to integer minor units of CANONICAL_CURRENCY"""
+    if amount is None:
+        return None
+    currency = currency.upper()
+    if currency not in RATES:
+        raise ValueError(f"No exchange rate configured for {currency}")
+    canonical = amount * RATES[currency] / RATES[CANONICAL_CURRENCY]
+    return round(canonical * 10 ** MINOR_DIGITS.get(CANONICAL_CURRENCY, 2))
+
+def product_price_minor(price: Optional[float]) -> Optional[int]:
+    return to_minor(price, PRODUCT_CURRENCY)
+
+def budget_minor(budget: Optional[float]) -> Optional[int]:
+    return to_minor(budget, BUDGET_CURRENCY)
+
+PRICE_BUCKET_EDGES_MINOR = [to_minor(edge, "USD") for edge in PRICE_BUCKET_EDGES]
+
+def price_bucket(price_minor: Optional[int]) -> Optional[int]:
+    return None if price_minor is None else bisect.bisect_left(PRICE_BUCKET_EDGES_MINOR, price_minor)
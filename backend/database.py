@@ -0,0 +1,206 @@
+from sqlalchemy import create_engine, event, inspect, text, Column, Integer, String, Float, Boolean, Text, DateTime, ForeignKey
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.orm import sessionmaker, declarative_base
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from datetime import datetime
+from currency import product_price_minor, price_bucket
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows: rely on the already-exists handling below
+    fcntl = None
+
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./chatbot.db")
+
+connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+engine = create_engine(DATABASE_URL, connect_args=connect_args)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base = declarative_base()
+
+class Product(Base):
+    __tablename__ = "products"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, index=True)
+    category = Column(String, index=True)
+    price = Column(Float)
+    ram = Column(Integer)
+    storage = Column(Integer)
+    weight = Column(Float)
+    screen_size = Column(Float)
+    processor = Column(String)
+    graphics = Column(String)
+    battery_life = Column(Integer)
+    use_case = Column(String)
+    upgradable_ram = Column(Boolean, default=False)
+    upgradable_storage = Column(Boolean, default=False)
+    description = Column(Text)
+    image_url = Column(String)
+    brand = Column(String, index=True)
+    # Canonical price in integer minor units (see currency.py), so budget filters are a plain range scan
+    price_minor = Column(Integer, index=True)
+    price_bucket = Column(Integer, index=True)
+
+@event.listens_for(Product, "before_insert")
+@event.listens_for(Product, "before_update")
+def _set_canonical_price(mapper, connection, product):
+    product.price_minor = product_price_minor(product.price)
+    product.price_bucket = price_bucket(product.price_minor)
+
+# Long, rarely read spec text (mostly Vietnamese, from the ETL's df_textual).
+# Kept out of the products table so search only touches the hot filter columns.
+DETAIL_COLUMNS = [
+    "link", "screen_tech", "ram_slots", "battery", "os", "ports", "audio_tech",
+    "special_features", "keyboard_light", "security", "webcam", "dimensions",
+    "wifi", "bluetooth", "card_reader", "material", "upper_case_material",
+    "lower_case_material", "screen_case_material", "screen_type", "power"
+]
+
+class ProductDetail(Base):
+    __tablename__ = "product_details"
+
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    link = Column(Text)
+    screen_tech = Column(Text)
+    ram_slots = Column(Text)
+    battery = Column(Text)
+    os = Column(Text)
+    ports = Column(Text)
+    audio_tech = Column(Text)
+    special_features = Column(Text)
+    keyboard_light = Column(Text)
+    security = Column(Text)
+    webcam = Column(Text)
+    dimensions = Column(Text)
+    wifi = Column(Text)
+    bluetooth = Column(Text)
+    card_reader = Column(Text)
+    material = Column(Text)
+    upper_case_material = Column(Text)
+    lower_case_material = Column(Text)
+    screen_case_material = Column(Text)
+    screen_type = Column(Text)
+    power = Column(Text)
+
+class ChatSession(Base):
+    __tablename__ = "chat_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, unique=True, index=True)
+    memory = Column(Text)
+    created_at = Column(DateTime, default=datetime.now, index=True)
+    updated_at = Column(DateTime, default=datetime.now, index=True)
+    # Clipped transcript of turns that fell out of the verbatim context window (oldest lines dropped)
+    summary = Column(Text)
+    summarized_through = Column(Integer, default=0)  # last ChatTurn.id moved into summary
+
+class ChatTurn(Base):
+    __tablename__ = "chat_turns"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, index=True)
+    role = Column(String)  # "user" or "assistant"
+    content = Column(Text)
+    created_at = Column(DateTime, default=datetime.now)
+
+_tables_created = False
+
+# Workers started together would otherwise race on ALTER TABLE / CREATE INDEX
+MIGRATION_LOCK_PATH = os.getenv("MIGRATION_LOCK_PATH", os.path.join(tempfile.gettempdir(), "chatbot-migrate.lock"))
+
+@contextmanager
+def _migration_lock():
+    """Serialize create_tables across processes on this host"""
+    if fcntl is None:
+        yield
+        return
+    with open(MIGRATION_LOCK_PATH, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _already_applied(exc: Exception) -> bool:
+    """Another process (or host) ran the same DDL first"""
+    message = str(exc).lower()
+    return "already exists" in message or "duplicate column" in message
+
+def create_tables():
+    """Create all tables once per process; later calls are no-ops"""
+    global _tables_created
+    if _tables_created:
+        return
+    with _migration_lock():
+        try:
+            Base.metadata.create_all(bind=engine)
+        except (OperationalError, ProgrammingError) as exc:
+            if not _already_applied(exc):
+                raise
+        _add_missing_columns()
+        _ensure_indexes()
+        _backfill_canonical_prices()
+    _tables_created = True
+
+def existing_columns(table) -> list:
+    """Columns of a mapped table that the database has; read-only tools use this instead of migrating"""
+    inspector = inspect(engine)
+    if not inspector.has_table(table.name):
+        return []
+    present = {column["name"] for column in inspector.get_columns(table.name)}
+    return [column for column in table.columns if column.name in present]
+
+def _add_missing_columns():
+    """create_all skips existing tables, so add nullable columns declared after a table was created"""
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            except (OperationalError, ProgrammingError) as exc:
+                if not _already_applied(exc):
+                    raise
+
+def _ensure_indexes():
+    """create_all skips existing tables, so add indexes declared after a table was created"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except (OperationalError, ProgrammingError) as exc:
+                if not _already_applied(exc):
+                    raise
+
+def _backfill_canonical_prices():
+    """Fill price_minor / price_bucket for rows written before the columns existed"""
+    with engine.begin() as conn:
+        rows = conn.execute(text(
+            "SELECT id, price FROM products WHERE price_minor IS NULL AND price IS NOT NULL"
+        )).all()
+        if rows:
+            updates = []
+            for product_id, price in rows:
+                minor = product_price_minor(price)
+                updates.append({"id": product_id, "minor": minor, "bucket": price_bucket(minor)})
+            conn.execute(text("UPDATE products SET price_minor = :minor, price_bucket = :bucket WHERE id = :id"),
+                         updates)
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,104 @@
+import re
+from typing import List, Dict, Optional
+from models import SlotMemory
+
+PURPOSE_KEYWORDS = {
+    "gaming": ["game", "gaming", "gamer"],
+    "education": ["school", "study", "student", "education", "class"],
+    "business": ["business", "office", "work", "meeting"],
+    "creative": ["design", "video", "editing", "photo", "creative"],
+    "programming": ["code", "coding", "programming", "developer"],
+    "general": ["browse", "browsing", "general", "everyday", "movie"],
+}
+
+PROPERTY_KEYWORDS = ["thin", "light", "portable", "powerful", "fast", "durable"]
+
+BRANDS = ["apple", "asus", "acer", "dell", "hp", "lenovo", "msi", "lg", "gigabyte", "microsoft", "samsung"]
+
+NEXT_SLOT_QUESTIONS = {
+    "budget": "Thanks! What budget do you have in mind for your new laptop?",
+    "ram": "How much RAM would you like (for example 8GB or 16GB)?",
+    "storage": "How much storage do you need (for example 256GB or 512GB)?",
+    "brand_preference": "Do you have a favourite brand, like Asus, Lenovo, Dell or Apple?",
+    "screen_size": "Do you prefer a small (13 inch), medium (14-15 inch) or large (16 inch+) screen?",
+}
+
+class DemoLLMService:
+    """Rule-based stand-in for LLMService used when no Google API key is configured"""
+
+    def extract_information(self, user_message: str, current_memory: SlotMemory, context: str = "",
+                            session_id: Optional[str] = None) -> SlotMemory:
+        """Extract slots from the message with keyword and regex rules"""
+        text = user_message.lower()
+        updated_memory = current_memory.copy()
+
+        budget = self._extract_budget(text)
+        if budget is not None:
+            updated_memory.budget = budget
+
+        ram = re.search(r"(\d+)\s*gb\s*(?:of\s*)?ram", text)
+        if ram:
+            updated_memory.ram = int(ram.group(1))
+
+        storage = re.search(r"(\d+)\s*(gb|tb)\s*(?:of\s*)?(?:storage|ssd|hdd|disk)", text)
+        if storage:
+            size = int(storage.group(1))
+            updated_memory.storage = size * 1000 if storage.group(2) == "tb" else size
+
+        for purpose, keywords in PURPOSE_KEYWORDS.items():
+            if any(keyword in text for keyword in keywords):
+                updated_memory.purpose = purpose
+                break
+
+        properties = [p for p in PROPERTY_KEYWORDS if p in text and p not in updated_memory.properties]
+        if properties:
+            updated_memory.properties = updated_memory.properties + properties
+
+        for brand in BRANDS:
+            if re.search(rf"\b{brand}\b", text):
+                updated_memory.brand_preference = brand.capitalize()
+                break
+
+        if any(word in text for word in ["high performance", "powerful", "heavy", "gaming"]):
+            updated_memory.performance_needs = "high"
+        elif "basic" in text or "simple" in text:
+            updated_memory.performance_needs = "basic"
+        elif "medium" in text or "moderate" in text:
+            updated_memory.performance_needs = "medium"
+
+        return updated_memory
+
+    def _extract_budget(self, text: str) -> Optional[float]:
+        match = re.search(r"\$\s*(\d[\d,]*(?:\.\d+)?)\s*(k)?", text)
+        if not match:
+            match = re.search(r"(\d[\d,]*(?:\.\d+)?)\s*(k)?\s*(?:\$|dollars?|usd|budget)", text)
+        if not match:
+            match = re.search(r"budget\D{0,20}(\d[\d,]*(?:\.\d+)?)\s*(k)?", text)
+        if not match:
+            return None
+        value = float(match.group(1).replace(",", ""))
+        return value * 1000 if match.group(2) else value
+
+    def generate_response(self, user_message: str, memory: SlotMemory, products: List[Dict] = None, context: str = "",
+                          session_id: Optional[str] = None, next_slot: Optional[str] = None) -> str:
+        """Build a templated reply asking for the next missing slot or listing products"""
+        if products:
+            names = ", ".join(p["name"] for p in products)
+            return f"Based on what you told me, here are some options: {names}. Would you like more details on any of them?"
+
+        if next_slot in NEXT_SLOT_QUESTIONS:
+            return NEXT_SLOT_QUESTIONS[next_slot]
+
+        if memory.budget is None:
+            return "Thanks! What budget do you have in mind for your new laptop?"
+        if memory.purpose is None:
+            return "Got it. What will you mainly use the laptop for - gaming, work, study or something else?"
+        if memory.performance_needs is None:
+            return "How much performance do you need - basic, medium or high?"
+        if memory.ram is None:
+            return "How much RAM would you like (for example 8GB or 16GB)?"
+        if memory.storage is None:
+            return "How much storage do you need (for example 256GB or 512GB)?"
+        return "Is there anything else you care about, like weight, screen size or a favourite brand?"
+
+demo_llm_service = DemoLLMService()
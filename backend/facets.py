@@ -0,0 +1,227 @@
+import bisect
+import heapq
+import math
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Sequence
+from models import SlotMemory, ProductResponse
+from fuzzy_index import get_fuzzy_index
+from currency import product_price_minor, price_bucket
+
+# Recommend as soon as the candidate set is this small (and non-empty)
+RECOMMEND_CANDIDATE_THRESHOLD = int(os.getenv("RECOMMEND_CANDIDATE_THRESHOLD", "5"))
+
+def screen_class(screen_size: Optional[float]) -> Optional[str]:
+    # Bins of the screen_size facet; sizes between bins belong to none
+    if screen_size is None:
+        return None
+    if screen_size <= 13:
+        return "small"
+    if 14 <= screen_size <= 15:
+        return "medium"
+    if screen_size >= 16:
+        return "large"
+    return None
+
+# Unfilled slot -> facet that answers it
+SLOT_FACETS = {
+    "budget": "price_bucket",
+    "ram": "ram",
+    "storage": "storage",
+    "brand_preference": "brand",
+    "screen_size": "screen_size",
+}
+
+SLOT_LABELS = {
+    "budget": "their budget",
+    "ram": "how much RAM they need",
+    "storage": "how much storage they need",
+    "brand_preference": "whether they prefer a brand",
+    "screen_size": "their preferred screen size",
+}
+
+class FacetEngine:
+    """Bitmap facet counts over the catalog.
+
+    Each facet value maps to an int bitmask with bit i set for product i, so
+    narrowing candidates is a few ANDs and counting is popcount.
+    """
+
+    def __init__(self, products: Sequence[ProductResponse], version: int = 0):
+        self.version = version
+        self.fuzzy_index = get_fuzzy_index(products, version)
+        self._bit_by_id: Dict[int, int] = {}
+        self.size = len(products)
+        self.all_mask = (1 << self.size) - 1
+        self.facets: Dict[str, Dict[object, int]] = {name: {} for name in SLOT_FACETS.values()}
+        self._use_cases: Dict[str, int] = {}
+        self._categories: Dict[str, int] = {}
+        self._weights: List[tuple] = []
+        self._upgradable_ram = 0
+        self._upgradable_storage = 0
+
+        prices = []
+        price_keys = []
+        for i, product in enumerate(products):
+            bit = 1 << i
+            self._bit_by_id[product.id] = bit
+            # Snapshots written before the canonical price columns existed lack them
+            price_minor = product.price_minor if product.price_minor is not None else product_price_minor(product.price)
+            values = {
+                "price_bucket": product.price_bucket if product.price_bucket is not None else price_bucket(price_minor),
+                "ram": product.ram,
+                "storage": product.storage,
+                "brand": product.brand,
+                "screen_size": screen_class(product.screen_size),
+            }
+            for facet, value in values.items():
+                if value is not None:
+                    self.facets[facet][value] = self.facets[facet].get(value, 0) | bit
+            if product.use_case:
+                self._use_cases[product.use_case] = self._use_cases.get(product.use_case, 0) | bit
+            if product.category:
+                self._categories[product.category] = self._categories.get(product.category, 0) | bit
+            if product.weight is not None:
+                self._weights.append((product.weight, bit))
+            if product.upgradable_ram:
+                self._upgradable_ram |= bit
+            if product.upgradable_storage:
+                self._upgradable_storage |= bit
+            if price_minor is not None:
+                prices.append((price_minor, bit))
+            price_keys.append((price_minor is None, price_minor or 0, i))
+
+        # Prefix masks over products sorted by price turn "price <= budget" into one bisect
+        prices.sort(key=lambda item: item[0])
+        self._sorted_prices = [price for price, _ in prices]
+        self._price_prefix = [0]
+        for _, bit in prices:
+            self._price_prefix.append(self._price_prefix[-1] | bit)
+        # Product positions cheapest first (unpriced last), for ordered result pages
+        self._price_order = [i for _, _, i in sorted(price_keys)]
+        self._price_rank = [0] * self.size
+        for rank, i in enumerate(self._price_order):
+            self._price_rank[i] = rank
+
+    def _union(self, facet: str, predicate: Callable[[object], bool]) -> int:
+        mask = 0
+        for value, value_mask in self.facets[facet].items():
+            if predicate(value):
+                mask |= value_mask
+        return mask
+
+    def _contains(self, index: Dict[str, int], needle: str) -> int:
+        # Case-insensitive substring match over distinct values, which are few
+        needle = needle.lower()
+        mask = 0
+        for value, value_mask in index.items():
+            if needle in value.lower():
+                mask |= value_mask
+        return mask
+
+    def candidates(self, memory: SlotMemory) -> int:
+        """Bitmask of products matching the filled slots, with search_products semantics"""
+        mask = self.all_mask
+        if memory.budget and memory.budget_minor is not None:
+            mask &= self._price_prefix[bisect.bisect_right(self._sorted_prices, memory.budget_minor)]
+        if memory.ram:
+            mask &= self._union("ram", lambda ram: ram >= memory.ram)
+        if memory.storage:
+            mask &= self._union("storage", lambda storage: storage >= memory.storage)
+        if memory.purpose:
+            mask &= self._contains(self._use_cases, memory.purpose)
+        if memory.category:
+            mask &= self._categories.get(memory.category, 0)
+        if memory.brand_preference:
+            brand = self.fuzzy_index.resolve_brand(memory.brand_preference)
+            if brand:
+                mask &= self.facets["brand"].get(brand, 0)
+            else:
+                mask &= self._union("brand", lambda value: memory.brand_preference.lower() in value.lower())
+        if memory.product_line:
+            product_ids = self.fuzzy_index.resolve_models(memory.product_line)
+            if product_ids:
+                model_mask = 0
+                for product_id in product_ids:
+                    model_mask |= self._bit_by_id.get(product_id, 0)
+                mask &= model_mask
+        if memory.weight_preference in ("light", "medium", "heavy"):
+            low, high = {"light": (0, 1.5), "medium": (1.5, 2.5), "heavy": (2.5, math.inf)}[memory.weight_preference]
+            weight_mask = 0
+            for weight, bit in self._weights:
+                if low <= weight <= high:
+                    weight_mask |= bit
+            mask &= weight_mask
+        if memory.screen_size in ("small", "medium", "large"):
+            mask &= self.facets["screen_size"].get(memory.screen_size, 0)
+        if memory.upgradability:
+            if "ram" in memory.upgradability.lower():
+                mask &= self._upgradable_ram
+            if "storage" in memory.upgradability.lower():
+                mask &= self._upgradable_storage
+        return mask
+
+    def cheapest(self, mask: int, limit: int) -> List[int]:
+        """Positions of up to limit products in mask, cheapest first"""
+        # Shifting the big mask per product is O(n) each; work on one 64-bit word copy instead
+        words = memoryview(mask.to_bytes((self.size + 63) // 64 * 8, "little")).cast("Q")
+        if mask.bit_count() * 64 >= self.size:
+            # Dense: walking the price order reaches limit hits quickly
+            positions = []
+            for i in self._price_order:
+                if words[i >> 6] >> (i & 63) & 1:
+                    positions.append(i)
+                    if len(positions) == limit:
+                        break
+            return positions
+        # Sparse: visit only the set bits and keep the cheapest by price rank
+        positions = []
+        for word_index, word in enumerate(words):
+            while word:
+                low = word & -word
+                positions.append((word_index << 6) + low.bit_length() - 1)
+                word ^= low
+        return heapq.nsmallest(limit, positions, key=self._price_rank.__getitem__)
+
+    def counts(self, facet: str, mask: int) -> Dict[object, int]:
+        """Per-value candidate counts for a facet within mask"""
+        result = {}
+        for value, value_mask in self.facets[facet].items():
+            count = (value_mask & mask).bit_count()
+            if count:
+                result[value] = count
+        return result
+
+    def best_next_slot(self, memory: SlotMemory, mask: Optional[int] = None) -> Optional[str]:
+        """Unfilled slot whose answer splits the remaining candidates most evenly (highest entropy)"""
+        mask = self.candidates(memory) if mask is None else mask
+        best_slot, best_entropy = None, 0.0
+        for slot, facet in SLOT_FACETS.items():
+            if getattr(memory, slot) is not None:
+                continue
+            counts = self.counts(facet, mask)
+            total = sum(counts.values())
+            if not total:
+                continue
+            entropy = -sum((c / total) * math.log2(c / total) for c in counts.values())
+            if entropy > best_entropy:
+                best_slot, best_entropy = slot, entropy
+        return best_slot
+
+# Engines by catalog version: the current one plus one prebuilt for an incoming snapshot
+_engines: Dict[int, FacetEngine] = {}
+_engine_lock = threading.Lock()
+KEPT_ENGINES = 2
+
+def get_facet_engine(products: Sequence[ProductResponse], version: int) -> FacetEngine:
+    """Facet engine for the given catalog version, built only the first time the version is seen"""
+    engine = _engines.get(version)
+    if engine is None:
+        with _engine_lock:
+            engine = _engines.get(version)
+            if engine is None:
+                engine = FacetEngine(products, version)
+                _engines[version] = engine
+                while len(_engines) > KEPT_ENGINES:
+                    del _engines[next(iter(_engines))]
+    return engine
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Fault-injecting stand-in for the Gemini model, for exercising deadlines,
+the circuit breaker and hedging offline.
+
+    python fault_stub.py --latency 2 --failure-rate 0.3 --deadline 1
+"""
+
+import argparse
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+@dataclass
+class StubResponse:
+    text: str
+
+class FaultInjectingModel:
+    """Mimics GenerativeModel.generate_content with configurable latency and failures"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, failure_rate: float = 0.0,
+                 seed: int = 0, reply: str = "This is a stubbed reply."):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.reply = reply
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str) -> StubResponse:
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.failure_rate
+        time.sleep(delay)
+        if fail:
+            raise RuntimeError("Injected upstream failure")
+        if "Return ONLY a JSON object" in prompt:
+            return StubResponse(text="{}")
+        return StubResponse(text=self.reply)
+
+def main():
+    from models import SlotMemory
+    from llm_service import LLMService
+    from resilience import CircuitBreaker, ResilientModel
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=2.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--deadline", type=float, default=1.0)
+    parser.add_argument("--hedge-after", type=float, default=None)
+    parser.add_argument("--calls", type=int, default=6)
+    args = parser.parse_args()
+
+    stub = FaultInjectingModel(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate)
+    model = ResilientModel(
+        stub,
+        deadline=args.deadline,
+        breaker=CircuitBreaker(failure_threshold=3, reset_timeout=30.0, slow_call_threshold=args.deadline),
+        hedge_after=args.hedge_after
+    )
+    service = LLMService(model=model)
+
+    for i in range(args.calls):
+        start = time.perf_counter()
+        reply = service.generate_response("I need a laptop", SlotMemory())
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"call {i + 1}: {elapsed:7.1f}ms breaker={model.breaker.state:<9} reply={reply[:50]!r}")
+    print(f"upstream calls made: {stub.calls}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import re
+import threading
+import unicodedata
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set
+from models import ProductResponse
+
+# Words in product names that say nothing about which model is meant
+GENERIC_TOKENS = {"laptop", "gaming", "notebook", "pc", "the", "and", "for", "with"}
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and collapse everything but letters and digits to single spaces"""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text).split())
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def max_distance_for(token: str) -> int:
+    # Model numbers ("f16", "16", "3050") must match exactly: one edit turns them into another model.
+    # Other short tokens tolerate one typo, longer ones two
+    if len(token) <= 2 or any(ch.isdigit() for ch in token):
+        return 0
+    return 1 if len(token) <= 5 else 2
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> int:
+    """Edit distance counting adjacent transpositions as one edit ("acre" -> "acer").
+
+    Returns max_distance + 1 as soon as the distance is certain to exceed max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    before_previous = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, start=1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            if before_previous is not None and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                current[j] = min(current[j], before_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        before_previous, previous = previous, current
+    return previous[-1]
+
+class TokenMatcher:
+    """Trigram-filtered, edit-distance-bounded lookup over a token vocabulary"""
+
+    def __init__(self, vocabulary: Iterable[str]):
+        self.vocabulary = set(vocabulary)
+        self._by_trigram: Dict[str, Set[str]] = {}
+        for token in self.vocabulary:
+            for gram in trigrams(token):
+                self._by_trigram.setdefault(gram, set()).add(token)
+
+    def match(self, token: str) -> Optional[str]:
+        """Closest vocabulary token within the typo budget for this token length"""
+        if token in self.vocabulary:
+            return token
+        limit = max_distance_for(token)
+        if limit == 0:
+            return None
+        candidates = set()
+        for gram in trigrams(token):
+            candidates |= self._by_trigram.get(gram, set())
+        best, best_distance = None, limit + 1
+        for candidate in sorted(candidates):
+            distance = bounded_levenshtein(token, candidate, limit)
+            if distance < best_distance:
+                best, best_distance = candidate, distance
+        return best
+
+class FuzzyIndex:
+    """Resolve free-text brand and model mentions to canonical brands and product ids"""
+
+    def __init__(self, products: Sequence[ProductResponse], version: int = 0):
+        self.version = version
+        self._brands: Dict[str, str] = {}  # normalized brand -> brand as stored
+        self._products_by_token: Dict[str, Set[int]] = {}
+        for product in products:
+            if product.brand:
+                self._brands.setdefault(normalize(product.brand), product.brand)
+            for token in normalize(product.name or "").split():
+                if token not in GENERIC_TOKENS:
+                    self._products_by_token.setdefault(token, set()).add(product.id)
+        self._brand_matcher = TokenMatcher(self._brands)
+        self._model_matcher = TokenMatcher(token for token in self._products_by_token if token not in self._brands)
+        self._cache: Dict[tuple, object] = {}
+
+    def _cached(self, key: tuple, compute):
+        if key not in self._cache:
+            if len(self._cache) > 4096:
+                self._cache.clear()
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def resolve_brand(self, text: Optional[str]) -> Optional[str]:
+        """Canonical brand (as stored on products) mentioned in text, tolerating typos"""
+        if not text:
+            return None
+        return self._cached(("brand", text), lambda: self._resolve_brand(normalize(text)))
+
+    def _resolve_brand(self, text: str) -> Optional[str]:
+        if text in self._brands:
+            return self._brands[text]
+        for token in text.split():
+            match = self._brand_matcher.match(token)
+            if match:
+                return self._brands[match]
+        return None
+
+    def resolve_models(self, text: Optional[str]) -> FrozenSet[int]:
+        """Ids of products whose names match every model token in text.
+
+        Empty (no model filter) when any non-generic, non-brand token is not
+        in the catalog: a partial match would confidently pick the wrong model.
+        """
+        if not text:
+            return frozenset()
+        return self._cached(("model", text), lambda: self._resolve_models(normalize(text)))
+
+    def _resolve_models(self, text: str) -> FrozenSet[int]:
+        matched: List[Set[int]] = []
+        for token in text.split():
+            if token in GENERIC_TOKENS or self._brand_matcher.match(token):
+                continue
+            match = self._model_matcher.match(token)
+            if not match:
+                return frozenset()
+            matched.append(self._products_by_token[match])
+        if not matched:
+            return frozenset()
+        return frozenset(set.intersection(*matched))
+
+_index: Optional[FuzzyIndex] = None
+_index_lock = threading.Lock()
+
+def get_fuzzy_index(products: Sequence[ProductResponse], version: int) -> FuzzyIndex:
+    """Fuzzy index for the given catalog version, rebuilt only when the version changes"""
+    global _index
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = FuzzyIndex(products, version)
+            index = _index
+    return index
@@ -0,0 +1,101 @@
+import gzip
+import hashlib
+import json
+from typing import Any, Optional
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli to enable "br" encoding
+    brotli = None
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag derived from the values that determine a response body"""
+    digest = hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Compare ignoring the weak prefix, as required for If-None-Match
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+def cached_json(content: Any, etag: str, cache_control: str) -> JSONResponse:
+    return JSONResponse(content=content, headers={"ETag": etag, "Cache-Control": cache_control})
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    encodings = set()
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        encodings.add(token.strip().lower())
+    return encodings
+
+class CompressionMiddleware:
+    """Brotli/gzip compression for response bodies above minimum_size.
+
+    Bodies are buffered before compressing; this API only returns small JSON
+    documents, so there is nothing to stream.
+    """
+
+    def __init__(self, app, minimum_size: int = 500, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        encoding: Optional[str] = None
+        if brotli is not None and "br" in accepted:
+            encoding = "br"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        chunks = []
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            await self._flush(send, start_message, b"".join(chunks), encoding)
+
+        await self.app(scope, receive, send_compressed)
+
+    async def _flush(self, send, start_message, body: bytes, encoding: str):
+        headers = MutableHeaders(raw=start_message["headers"])
+        if len(body) >= self.minimum_size and "content-encoding" not in headers:
+            if encoding == "br":
+                body = brotli.compress(body, quality=self.brotli_quality)
+            else:
+                body = gzip.compress(body, compresslevel=self.gzip_level)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+        await send(start_message)
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,34 @@
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_provider = None
+_provider_lock = threading.Lock()
+
+def _has_google_api_key() -> bool:
+    google_api_key = os.getenv("GOOGLE_API_KEY")
+    return bool(google_api_key) and google_api_key != "your_google_api_key_here"
+
+def get_llm_service():
+    """Resolve the LLM service once per process and return the cached instance"""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                if _has_google_api_key():
+                    from llm_service import llm_service
+                    print(f"Using Google Gemini API with key: {os.getenv('GOOGLE_API_KEY')[:5]}...")
+                    _provider = llm_service
+                else:
+                    from demo_llm_service import demo_llm_service
+                    print("No valid Google API key found. Using demo LLM service.")
+                    _provider = demo_llm_service
+    return _provider
+
+def reset_llm_service():
+    """Forget the resolved provider so the next call re-reads the environment"""
+    global _provider
+    with _provider_lock:
+        _provider = None
@@ -1,134 +1,203 @@
-from fastapi import FastAPI, Depends, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from database import get_db, create_tables
-from models import ChatMessage, ChatResponse, SlotMemory
-from services import ProductService, SessionService
-from llm_service import llm_service
-from demo_llm_service import demo_llm_service
-import uuid
-import os
-from typing import Dict, Any
-
-app = FastAPI(title="AI Chatbot API", version="1.0.0")
-
-# CORS middleware for frontend integration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify your frontend domain
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Create database tables on startup
-@app.on_event("startup")
-async def startup_event():
-    create_tables()
-
-@app.get("/")
-async def root():
-    return {"message": "AI Chatbot API is running"}
-
-@app.post("/chat", response_model=ChatResponse)
-async def chat(message: ChatMessage, db: Session = Depends(get_db)):
-    """Main chat endpoint that handles conversation flow"""
-    try:
-        # Initialize services
-        session_service = SessionService(db)
-        product_service = ProductService(db)
-        
-        # Choose LLM service based on Google API key availability
-        google_api_key = os.getenv("GOOGLE_API_KEY")
-        if google_api_key and google_api_key != "your_google_api_key_here":
-            print(f"Using Google Gemini API with key: {google_api_key[:5]}...")
-            current_llm_service = llm_service
-        else:
-            print("No valid Google API key found. Using demo LLM service.")
-            current_llm_service = demo_llm_service
-        
-        # Get or create session memory
-        current_memory = session_service.get_or_create_session(message.session_id)
-        
-        # Extract information from user message
-        updated_memory = current_llm_service.extract_information(message.message, current_memory)
-        
-        # Update session in database
-        session_service.update_session(message.session_id, updated_memory)
-        
-        # Check if we should recommend products
-        should_recommend = session_service.should_recommend_products(updated_memory)
-        
-        recommended_products = []
-        if should_recommend:
-            # Search for products
-            products = product_service.search_products(updated_memory)
-            recommended_products = [product.dict() for product in products]
-            
-            # Generate response with product recommendations
-            reply = current_llm_service.generate_response(
-                message.message, 
-                updated_memory, 
-                recommended_products
-            )
-            
-            return ChatResponse(
-                reply=reply,
-                session_id=message.session_id,
-                needs_more_info=False,
-                recommended_products=recommended_products
-            )
-        else:
-            # Generate response asking for more information
-            reply = current_llm_service.generate_response(message.message, updated_memory)
-            
-            return ChatResponse(
-                reply=reply,
-                session_id=message.session_id,
-                needs_more_info=True,
-                recommended_products=[]
-            )
-            
-    except Exception as e:
-        print(f"Error in chat endpoint: {e}")
-        return ChatResponse(
-            reply="I apologize, but I'm having some technical difficulties. Please try again.",
-            session_id=message.session_id,
-            needs_more_info=True,
-            recommended_products=[]
-        )
-
-@app.get("/session/{session_id}/memory")
-async def get_session_memory(session_id: str, db: Session = Depends(get_db)):
-    """Get current memory state for a session (for debugging)"""
-    session_service = SessionService(db)
-    memory = session_service.get_or_create_session(session_id)
-    return memory.dict()
-
-@app.post("/session/new")
-async def create_new_session():
-    """Create a new session ID"""
-    return {"session_id": str(uuid.uuid4())}
-
-@app.get("/products/search")
-async def search_products_endpoint(
-    budget: float = None,
-    category: str = None,
-    purpose: str = None,
-    db: Session = Depends(get_db)
-):
-    """Direct product search endpoint (for testing)"""
-    memory = SlotMemory(
-        budget=budget,
-        category=category,
-        purpose=purpose
-    )
-    
-    product_service = ProductService(db)
-    products = product_service.search_products(memory)
-    
-    return [product.dict() for product in products]
-
-if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from database import get_db, create_tables
+from models import ChatMessage, ChatResponse, SlotMemory, CompareResponse
+from services import ProductService, SessionService
+from chat_flow import run_chat_turn
+from coalescing import SingleFlight, SessionLocks, memory_fingerprint
+from warmup import warm_up
+from session_sweeper import session_sweeper
+from usage import usage_tracker
+from admission import chat_admission, AdmissionRejected, PRIORITY_ONGOING, PRIORITY_NEW
+from catalog import product_catalog
+from currency import budget_minor
+from product_details import product_detail_store, build_comparison
+from http_cache import CompressionMiddleware, make_etag, etag_matches, not_modified, cached_json
+from profiling import ProfilingMiddleware, profiling_config
+import uuid
+import os
+from typing import Dict, Any
+
+app = FastAPI(title="AI Chatbot API", version="1.0.0")
+
+# In-flight /chat coalescing and per-session turn ordering
+chat_flights = SingleFlight()
+session_locks = SessionLocks(
+    max_pending=int(os.getenv("CHAT_SESSION_MAX_PENDING", "4")),
+    timeout=float(os.getenv("CHAT_SESSION_WAIT_SECONDS", "30"))
+)
+
+# CORS middleware for frontend integration
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # In production, specify your frontend domain
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After"],
+)
+
+# Compress larger JSON bodies (brotli when installed, otherwise gzip)
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.getenv("COMPRESS_MIN_BYTES", "500")))
+
+# Opt-in request profiling; not installed at all unless PROFILE_DIR is set
+_profiling = profiling_config()
+if _profiling:
+    app.add_middleware(ProfilingMiddleware, **_profiling)
+
+PRODUCTS_CACHE_CONTROL = f"public, max-age={int(os.getenv('PRODUCTS_CACHE_MAX_AGE', '60'))}"
+SESSION_CACHE_CONTROL = "private, no-cache"
+COMPARE_MAX_PRODUCTS = int(os.getenv("COMPARE_MAX_PRODUCTS", "5"))
+
+# Warm up before accepting traffic (set WARMUP_ON_STARTUP=0 to only create tables)
+@app.on_event("startup")
+async def startup_event():
+    if os.getenv("WARMUP_ON_STARTUP", "1") != "0":
+        warm_up()
+    else:
+        create_tables()
+    product_catalog.start_watching()
+    session_sweeper.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    product_catalog.stop_watching()
+    await session_sweeper.stop()
+
+@app.get("/")
+async def root():
+    return {"message": "AI Chatbot API is running"}
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(message: ChatMessage, db: Session = Depends(get_db)):
+    """Main chat endpoint that handles conversation flow"""
+    try:
+        # Duplicate requests (retries, double-clicks) share one in-flight turn
+        session_service = SessionService(db)
+        # Read-only until admitted: sessions with real history (filled slots or turns) go ahead of new ones
+        current_memory, has_history = await run_in_threadpool(session_service.peek_session, message.session_id)
+        priority = PRIORITY_ONGOING if has_history else PRIORITY_NEW
+        flight_key = (message.session_id, message.message, memory_fingerprint(current_memory))
+
+        async def locked_turn():
+            async with session_locks.hold(message.session_id):
+                async with chat_admission.admit(priority):
+                    return await run_in_threadpool(run_chat_turn, db, message)
+
+        response, shared = await chat_flights.do(flight_key, locked_turn)
+        if shared:
+            print(f"Coalesced duplicate chat request for session {message.session_id}")
+            usage_tracker.record(message.session_id, 0, 0, 0.0, cached=True)
+        return response
+
+    except AdmissionRejected as e:
+        print(f"Rejected chat request for session {message.session_id}: {e.reason}")
+        raise HTTPException(
+            status_code=503,
+            detail="The assistant is busy right now. Please try again shortly.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+            
+    except Exception as e:
+        print(f"Error in chat endpoint: {e}")
+        return ChatResponse(
+            reply="I apologize, but I'm having some technical difficulties. Please try again.",
+            session_id=message.session_id,
+            needs_more_info=True,
+            recommended_products=[]
+        )
+
+@app.get("/session/{session_id}/memory")
+async def get_session_memory(session_id: str, request: Request, db: Session = Depends(get_db)):
+    """Get current memory state for a session (for debugging)"""
+    session_service = SessionService(db)
+    memory, _ = session_service.peek_session(session_id)
+    etag = make_etag(session_id, memory_fingerprint(memory))
+    if etag_matches(request, etag):
+        return not_modified(etag, SESSION_CACHE_CONTROL)
+    return cached_json(memory.dict(), etag, SESSION_CACHE_CONTROL)
+
+@app.get("/session/{session_id}/usage")
+async def get_session_usage(session_id: str):
+    """Estimated LLM token usage, latency and cache hits for a session"""
+    return usage_tracker.session_stats(session_id)
+
+@app.get("/admission/stats")
+async def get_admission_stats():
+    """Concurrency, queue depth and rejection counts for /chat in this worker"""
+    return dict(chat_admission.stats(), session_rejected=session_locks.rejected, pending_sessions=len(session_locks))
+
+@app.get("/usage")
+async def get_usage():
+    """Estimated LLM token usage across all sessions in this worker"""
+    return usage_tracker.global_stats()
+
+@app.post("/session/new")
+async def create_new_session():
+    """Create a new session ID"""
+    return {"session_id": str(uuid.uuid4())}
+
+@app.get("/products/search")
+async def search_products_endpoint(
+    request: Request,
+    budget: float = None,
+    category: str = None,
+    purpose: str = None,
+    db: Session = Depends(get_db)
+):
+    """Direct product search endpoint (for testing)"""
+    # Results only change with the catalog version, so revalidation skips the query
+    etag = make_etag(product_catalog.version, budget, category, purpose)
+    if etag_matches(request, etag):
+        return not_modified(etag, PRODUCTS_CACHE_CONTROL)
+
+    memory = SlotMemory(
+        budget=budget,
+        budget_minor=budget_minor(budget),
+        category=category,
+        purpose=purpose
+    )
+    
+    product_service = ProductService(db)
+    products = product_service.search_products(memory)
+    
+    return cached_json([product.dict() for product in products], etag, PRODUCTS_CACHE_CONTROL)
+
+@app.get("/products/compare", response_model=CompareResponse)
+async def compare_products_endpoint(request: Request, ids: str, db: Session = Depends(get_db)):
+    """Side-by-side specs for up to COMPARE_MAX_PRODUCTS products, e.g. /products/compare?ids=3,7,8"""
+    try:
+        product_ids = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if not product_ids or len(product_ids) > COMPARE_MAX_PRODUCTS:
+        raise HTTPException(status_code=400, detail=f"Pass between 1 and {COMPARE_MAX_PRODUCTS} product ids")
+
+    # One version read for the ETag and the detail cache, so both describe the same catalog
+    version = product_catalog.version
+    etag = make_etag("compare", version, product_ids)
+    if etag_matches(request, etag):
+        return not_modified(etag, PRODUCTS_CACHE_CONTROL)
+
+    # Hot fields come from the in-memory catalog; only the long spec text is loaded (and cached) here
+    products = []
+    for product_id in product_ids:
+        product = product_catalog.get(db, product_id)
+        if product is None:
+            raise HTTPException(status_code=404, detail=f"Product {product_id} not found")
+        products.append(product.dict())
+    details = await run_in_threadpool(product_detail_store.get_many, db, product_ids, version)
+
+    comparison = CompareResponse(products=products, specs=build_comparison(products, details))
+    return cached_json(comparison.dict(), etag, PRODUCTS_CACHE_CONTROL)
+
+if __name__ == "__main__":
+    import uvicorn
+    # Workers share the product snapshot mapping (PRODUCT_SNAPSHOT_PATH) instead of each copying the catalog
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    if workers > 1:
+        # Migrate once here so the workers' startup hooks find the schema current
+        create_tables()
+    uvicorn.run("main:app" if workers > 1 else app, host="0.0.0.0", port=8000, workers=workers)
@@ -1,45 +1,57 @@
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
-from datetime import datetime
-
-class SlotMemory(BaseModel):
-    budget: Optional[float] = None
-    ram: Optional[int] = None
-    storage: Optional[int] = None
-    purpose: Optional[str] = None
-    properties: List[str] = []
-    upgradability: Optional[str] = None  # "ram", "storage", "both", "none"
-    category: Optional[str] = None  # laptop, smartphone, etc.
-    brand_preference: Optional[str] = None
-    screen_size: Optional[str] = None  # "small", "medium", "large"
-    weight_preference: Optional[str] = None  # "light", "medium", "heavy"
-    performance_needs: Optional[str] = None  # "basic", "medium", "high"
-
-class ChatMessage(BaseModel):
-    message: str
-    session_id: str
-
-class ChatResponse(BaseModel):
-    reply: str
-    session_id: str
-    needs_more_info: bool
-    recommended_products: List[Dict[str, Any]] = []
-
-class ProductResponse(BaseModel):
-    id: int
-    name: str
-    category: str
-    price: float
-    ram: Optional[int]
-    storage: Optional[int]
-    weight: Optional[float]
-    screen_size: Optional[float]
-    processor: Optional[str]
-    graphics: Optional[str]
-    battery_life: Optional[int]
-    use_case: Optional[str]
-    upgradable_ram: bool
-    upgradable_storage: bool
-    description: Optional[str]
-    image_url: Optional[str]
-    brand: Optional[str]
+from pydantic import BaseModel
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+
+class SlotMemory(BaseModel):
+    budget: Optional[float] = None
+    budget_minor: Optional[int] = None  # budget in canonical minor units, set when budget changes
+    ram: Optional[int] = None
+    storage: Optional[int] = None
+    purpose: Optional[str] = None
+    properties: List[str] = []
+    upgradability: Optional[str] = None  # "ram", "storage", "both", "none"
+    category: Optional[str] = None  # laptop, smartphone, etc.
+    brand_preference: Optional[str] = None
+    product_line: Optional[str] = None  # free-text model or series, e.g. "tuf f16"
+    screen_size: Optional[str] = None  # "small", "medium", "large"
+    weight_preference: Optional[str] = None  # "light", "medium", "heavy"
+    performance_needs: Optional[str] = None  # "basic", "medium", "high"
+
+class ChatMessage(BaseModel):
+    message: str
+    session_id: str
+
+class ChatResponse(BaseModel):
+    reply: str
+    session_id: str
+    needs_more_info: bool
+    recommended_products: List[Dict[str, Any]] = []
+
+class SpecRow(BaseModel):
+    field: str
+    values: List[Any]
+
+class CompareResponse(BaseModel):
+    products: List[Dict[str, Any]]
+    specs: List[SpecRow]
+
+class ProductResponse(BaseModel):
+    id: int
+    name: str
+    category: str
+    price: float
+    ram: Optional[int]
+    storage: Optional[int]
+    weight: Optional[float]
+    screen_size: Optional[float]
+    processor: Optional[str]
+    graphics: Optional[str]
+    battery_life: Optional[int]
+    use_case: Optional[str]
+    upgradable_ram: bool
+    upgradable_storage: bool
+    description: Optional[str]
+    image_url: Optional[str]
+    brand: Optional[str]
+    price_minor: Optional[int] = None
+    price_bucket: Optional[int] = None
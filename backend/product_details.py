@@ -0,0 +1,70 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy.orm import Session
+from database import ProductDetail, DETAIL_COLUMNS
+
+# Hot fields already in ProductResponse that are worth comparing side by side
+COMPARE_HOT_FIELDS = ["brand", "price", "processor", "graphics", "ram", "storage", "screen_size", "weight", "battery_life"]
+
+class ProductDetailStore:
+    """Lazily loaded detailed specs keyed by product id, with a bounded LRU cache.
+
+    The cache belongs to one catalog version: the ETL rewrites product_details
+    together with the snapshot, so a new version drops every cached entry.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[int, Optional[Dict[str, Optional[str]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, db: Session, product_ids: Iterable[int],
+                 version: Optional[int] = None) -> Dict[int, Optional[Dict[str, Optional[str]]]]:
+        """Details for each id (None when a product has no detail row); misses load in one query"""
+        product_ids = list(product_ids)
+        result = {}
+        missing = []
+        with self._lock:
+            if version != self.version:
+                self._cache.clear()
+                self.version = version
+            for product_id in product_ids:
+                if product_id in self._cache:
+                    self._cache.move_to_end(product_id)
+                    result[product_id] = self._cache[product_id]
+                    self.hits += 1
+                else:
+                    missing.append(product_id)
+                    self.misses += 1
+
+        if missing:
+            rows = db.query(ProductDetail).filter(ProductDetail.product_id.in_(missing)).all()
+            loaded = {row.product_id: {name: getattr(row, name) for name in DETAIL_COLUMNS} for row in rows}
+            with self._lock:
+                if version != self.version:
+                    # The catalog moved on while loading; serve these rows but don't cache them
+                    result.update((product_id, loaded.get(product_id)) for product_id in missing)
+                    return result
+                for product_id in missing:
+                    details = loaded.get(product_id)
+                    result[product_id] = details
+                    self._cache[product_id] = details
+                    if len(self._cache) > self.max_entries:
+                        self._cache.popitem(last=False)
+        return result
+
+def build_comparison(products: List[Dict], details: Dict[int, Optional[Dict[str, Optional[str]]]]) -> List[Dict]:
+    """Side-by-side rows: one per field, one value per product; detail fields nobody has are dropped"""
+    specs = [{"field": field, "values": [p.get(field) for p in products]} for field in COMPARE_HOT_FIELDS]
+    for field in DETAIL_COLUMNS:
+        values = [(details.get(p["id"]) or {}).get(field) for p in products]
+        if any(value is not None for value in values):
+            specs.append({"field": field, "values": values})
+    return specs
+
+product_detail_store = ProductDetailStore(max_entries=int(os.getenv("PRODUCT_DETAIL_CACHE_SIZE", "256")))
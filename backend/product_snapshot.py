@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Versioned, memory-mapped columnar product snapshot.
+
+The ETL (or `python product_snapshot.py` from the database) writes one file
+per catalog version; every uvicorn worker maps it read-only, so the page
+cache holds the catalog once per host instead of once per worker. Numeric
+columns are fixed-width arrays, string columns are an offset table plus a
+UTF-8 blob. Files are written in native byte order and are meant to be read
+on the host that wrote them.
+
+Layout:
+    header   magic, format version, catalog version, row count, column count
+    columns  name, kind ('q' int64, 'd' float64, 's' string), offset, size
+    data     8-byte aligned column sections
+"""
+
+import argparse
+import array
+import bisect
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from currency import product_price_minor, price_bucket
+
+MAGIC = b"PRODSNAP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIQQI")
+COLUMN_ENTRY = struct.Struct("<32scQQ")
+
+INT_NULL = -(2 ** 63)
+
+NUMERIC_COLUMNS = [
+    ("id", "q"),
+    ("price", "d"),
+    ("ram", "q"),
+    ("storage", "q"),
+    ("weight", "d"),
+    ("screen_size", "d"),
+    ("battery_life", "q"),
+    ("upgradable_ram", "q"),
+    ("upgradable_storage", "q"),
+    ("price_minor", "q"),
+    ("price_bucket", "q"),
+]
+
+STRING_COLUMNS = ["name", "category", "processor", "graphics", "use_case", "description", "image_url", "brand"]
+
+BOOLEAN_COLUMNS = {"upgradable_ram", "upgradable_storage"}
+
+# Columns ProductResponse cannot do without; rows missing any of them are not written
+REQUIRED_COLUMNS = ["id", "name", "category", "price"]
+
+def is_servable(row: Dict[str, Any]) -> bool:
+    return all(row.get(name) not in (None, "") for name in REQUIRED_COLUMNS)
+
+def _with_canonical_price(row: Dict[str, Any]) -> Dict[str, Any]:
+    # Same rule as the database's before_insert hook, for rows from before the canonical columns existed
+    if row.get("price_minor") is not None and row.get("price_bucket") is not None:
+        return row
+    price_minor = row.get("price_minor")
+    if price_minor is None:
+        price_minor = product_price_minor(row["price"])
+    return {**row, "price_minor": price_minor, "price_bucket": price_bucket(price_minor)}
+
+def _encode_number(value, kind: str):
+    if kind == "q":
+        return INT_NULL if value is None else int(value)
+    return math.nan if value is None else float(value)
+
+def _decode_number(value, kind: str):
+    if kind == "q":
+        return None if value == INT_NULL else value
+    return None if math.isnan(value) else value
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+def write_snapshot(path: str, rows: Iterable[Dict[str, Any]], version: Optional[int] = None) -> int:
+    """Write rows to path atomically and return the catalog version written"""
+    rows = list(rows)
+    servable = [row for row in rows if is_servable(row)]
+    if len(servable) < len(rows):
+        print(f"Skipped {len(rows) - len(servable)} products missing one of {', '.join(REQUIRED_COLUMNS)}")
+    rows = sorted((_with_canonical_price(row) for row in servable), key=lambda row: row["id"])
+    version = version or time.time_ns() // 1_000_000
+
+    sections = []
+    for name, kind in NUMERIC_COLUMNS:
+        values = array.array(kind, (_encode_number(row.get(name), kind) for row in rows))
+        sections.append((name, kind, values.tobytes()))
+    for name in STRING_COLUMNS:
+        offsets = array.array("q", [0])
+        blob = bytearray()
+        for row in rows:
+            # None and "" are both stored as an empty slice
+            blob += (row.get(name) or "").encode("utf-8")
+            offsets.append(len(blob))
+        sections.append((name, "s", offsets.tobytes() + bytes(blob)))
+
+    directory = bytearray()
+    position = _align(HEADER.size + COLUMN_ENTRY.size * len(sections))
+    layout = []
+    for name, kind, payload in sections:
+        directory += COLUMN_ENTRY.pack(name.encode("utf-8"), kind.encode("ascii"), position, len(payload))
+        layout.append((position, payload))
+        position = _align(position + len(payload))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, version, len(rows), len(sections)))
+        f.write(directory)
+        for offset, payload in layout:
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    # Readers either see the old file or the complete new one
+    os.replace(tmp_path, path)
+    return version
+
+class StringColumn:
+    """Zero-copy view over an offset table and UTF-8 blob"""
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return bytes(self._data[start:end]).decode("utf-8") if end > start else None
+
+class ProductSnapshot:
+    """Read-only mapping of one snapshot file"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        magic, format_version, self.version, self.rows, column_count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a product snapshot (format {FORMAT_VERSION})")
+
+        self._kinds: Dict[str, str] = {}
+        self._columns: Dict[str, Any] = {}
+        for i in range(column_count):
+            raw_name, raw_kind, offset, size = COLUMN_ENTRY.unpack_from(buffer, HEADER.size + i * COLUMN_ENTRY.size)
+            name = raw_name.rstrip(b"\0").decode("utf-8")
+            kind = raw_kind.decode("ascii")
+            section = buffer[offset:offset + size]
+            if kind == "s":
+                table_size = (self.rows + 1) * 8
+                self._columns[name] = StringColumn(section[:table_size].cast("q"), section[table_size:])
+            else:
+                self._columns[name] = section.cast(kind)
+            self._kinds[name] = kind
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, name: str):
+        """Raw column: a memoryview for numeric columns (nulls as sentinels), StringColumn otherwise"""
+        return self._columns[name]
+
+    def find(self, product_id: int) -> Optional[int]:
+        """Row index for a product id (ids are stored sorted)"""
+        ids = self._columns["id"]
+        index = bisect.bisect_left(ids, product_id)
+        return index if index < self.rows and ids[index] == product_id else None
+
+    def row(self, index: int) -> Dict[str, Any]:
+        row = {}
+        for name, column in self._columns.items():
+            kind = self._kinds[name]
+            value = column[index] if kind == "s" else _decode_number(column[index], kind)
+            row[name] = bool(value) if name in BOOLEAN_COLUMNS else value
+        return row
+
+class SnapshotWatcher:
+    """Hands out the current snapshot and hot-swaps when a new file appears on disk.
+
+    on_load runs on each new snapshot before it is handed out, so derived
+    indexes are ready when readers see it. Until start() the file is checked
+    on access; after it a background thread checks, keeping loads (and
+    on_load) off the request path.
+    """
+
+    def __init__(self, path: str, check_interval: float = 2.0,
+                 on_load: Optional[Callable[[ProductSnapshot], None]] = None):
+        self.path = path
+        self.check_interval = check_interval
+        self.on_load = on_load
+        self._snapshot: Optional[ProductSnapshot] = None
+        self._stat_key = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def current(self) -> Optional[ProductSnapshot]:
+        # With the poller running, only check inline until a first snapshot is found
+        if (self._thread is None or self._snapshot is None) and \
+                time.monotonic() - self._checked_at >= self.check_interval:
+            self._refresh()
+        return self._snapshot
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._poll, name="snapshot-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _poll(self):
+        while not self._stop.wait(self.check_interval):
+            self._refresh()
+
+    def _refresh(self):
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return
+            stat_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if stat_key == self._stat_key:
+                return
+            try:
+                snapshot = ProductSnapshot(self.path)
+            except Exception as e:
+                print(f"Error loading product snapshot {self.path}: {e}")
+                return
+            if self.on_load is not None:
+                try:
+                    self.on_load(snapshot)
+                except Exception as e:
+                    print(f"Error preparing product snapshot version {snapshot.version}: {e}")
+            # Single reference swap; readers holding the old snapshot keep a valid mapping
+            self._snapshot = snapshot
+            self._stat_key = stat_key
+            print(f"Loaded product snapshot version {snapshot.version} ({snapshot.rows} products)")
+
+def export_from_database(path: str) -> int:
+    """Write a snapshot of the products table"""
+    from sqlalchemy import select
+    from database import SessionLocal, Product, existing_columns
+
+    # Read only the columns the table has; write_snapshot fills price_minor / price_bucket if missing
+    wanted = {name for name, _ in NUMERIC_COLUMNS} | set(STRING_COLUMNS)
+    columns = [column for column in existing_columns(Product.__table__) if column.name in wanted]
+    db = SessionLocal()
+    try:
+        rows = [dict(row) for row in db.execute(select(*columns)).mappings()]
+    finally:
+        db.close()
+    version = write_snapshot(path, rows)
+    print(f"Wrote {len(rows)} products to {path} (version {version})")
+    return version
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the products table to a memory-mapped snapshot")
+    parser.add_argument("--out", default=os.getenv("PRODUCT_SNAPSHOT_PATH", "products.snapshot"))
+    args = parser.parse_args()
+    export_from_database(args.out)
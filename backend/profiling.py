@@ -0,0 +1,185 @@
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+class SamplingProfiler:
+    """Low-overhead wall-clock sampler built on sys._current_frames().
+
+    A background thread snapshots every thread's stack each interval and
+    keeps stacks that pass through backend code, so time spent in Pydantic,
+    json, SQLAlchemy or waiting on the network is attributed to the app
+    frame that triggered it. Samples are process-wide: concurrent requests
+    and background work (e.g. the session sweeper) running backend code in
+    the same window land in the same profile, and the output says so.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: List[Tuple[Frame, ...]] = []
+        # Other requests in flight when profiling started (they share the event loop and thread pool)
+        self.concurrent_requests = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at = 0.0
+        self.duration = 0.0
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                in_backend = False
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    in_backend = in_backend or code.co_filename.startswith(BACKEND_DIR)
+                    frame = frame.f_back
+                if in_backend:
+                    stack.reverse()
+                    self.samples.append(tuple(stack))
+
+    def speedscope(self, name: str) -> Dict:
+        """Profile in speedscope's sampled format (open at https://www.speedscope.app)"""
+        frame_index: Dict[Frame, int] = {}
+        samples = []
+        for stack in self.samples:
+            samples.append([frame_index.setdefault(frame, len(frame_index)) for frame in stack])
+        frames = [{"name": function, "file": filename, "line": line}
+                  for (function, filename, line) in frame_index]
+        interval_ms = self.interval * 1000
+        name = f"{name} (process-wide samples)"
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "backend/profiling.py",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": self.duration * 1000,
+                "samples": samples,
+                "weights": [interval_ms] * len(samples),
+            }],
+        }
+
+    def summary(self, top: int = 30) -> str:
+        """Per-function self and total sample counts, highest total first"""
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack in self.samples:
+            self_counts[stack[-1]] += 1
+            for frame in set(stack):
+                total_counts[frame] += 1
+        interval_ms = self.interval * 1000
+        lines = [f"{len(self.samples)} samples every {interval_ms:.1f}ms over {self.duration * 1000:.1f}ms",
+                 f"process-wide: all threads in backend code; {self.concurrent_requests} other requests "
+                 f"were in flight when profiling started",
+                 f"{'total ms':>10} {'self ms':>10}  function"]
+        for frame, count in total_counts.most_common(top):
+            function, filename, line = frame
+            if filename.startswith(BACKEND_DIR):
+                filename = os.path.relpath(filename, BACKEND_DIR)
+            lines.append(f"{count * interval_ms:10.1f} {self_counts[frame] * interval_ms:10.1f}  "
+                         f"{function} ({filename}:{line})")
+        return "\n".join(lines) + "\n"
+
+class ProfilingMiddleware:
+    """Profile a request when it sends the trigger header or is picked by the sampling rate.
+
+    Only installed when profiling is configured (see profiling_config), so
+    disabled deployments do not pay for it at all.
+    """
+
+    def __init__(self, app, output_dir: str, sample_rate: float = 0.0, header: str = "x-profile",
+                 token: Optional[str] = None, interval: float = 0.005):
+        self.app = app
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.header = header.lower()
+        self.token = token
+        self.interval = interval
+        self.in_flight = 0
+
+    def _should_profile(self, scope) -> bool:
+        value = Headers(scope=scope).get(self.header)
+        if value is not None:
+            # Header-triggered profiles write files, so they always need the token
+            return bool(self.token) and value == self.token
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        try:
+            if not self._should_profile(scope):
+                await self.app(scope, receive, send)
+                return
+
+            profiler = SamplingProfiler(self.interval)
+            profiler.concurrent_requests = self.in_flight - 1
+            profiler.start()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                profiler.stop()
+                await run_in_threadpool(self._write, profiler, scope)
+        finally:
+            self.in_flight -= 1
+
+    def _write(self, profiler: SamplingProfiler, scope):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path_slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{scope['method']}-{path_slug}"
+        base = os.path.join(self.output_dir, name)
+        with open(f"{base}.speedscope.json", "w", encoding="utf-8") as f:
+            json.dump(profiler.speedscope(f"{scope['method']} {scope['path']}"), f)
+        with open(f"{base}.txt", "w", encoding="utf-8") as f:
+            f.write(profiler.summary())
+        print(f"Wrote request profile {base}.speedscope.json ({len(profiler.samples)} samples)")
+
+def profiling_config() -> Optional[Dict]:
+    """Middleware settings from the environment, or None when profiling is disabled.
+
+    PROFILE_DIR            enables profiling and sets the output directory
+    PROFILE_SAMPLE_RATE    fraction of requests to profile without the header (default 0)
+    PROFILE_TOKEN          value the X-Profile header must carry; without it the header is ignored
+    PROFILE_INTERVAL_MS    sampling interval (default 5)
+    """
+    output_dir = os.getenv("PROFILE_DIR")
+    if not output_dir:
+        return None
+    return {
+        "output_dir": output_dir,
+        "sample_rate": float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+        "token": os.getenv("PROFILE_TOKEN") or None,
+        "interval": float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000,
+    }
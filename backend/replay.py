@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Replay multi-turn conversations through the chat pipeline and check for regressions.
+
+Each conversation is run turn by turn through chat_flow.run_chat_turn against
+an in-memory copy of the product table, using the deterministic rule-based
+DemoLLMService in place of Gemini. Reported per run:
+
+- turns-to-recommendation (first turn that returned products)
+- recommendation overlap with a saved baseline (Jaccard of product ids)
+- per-turn latency (p50/p95)
+
+Usage:
+    python replay.py --synthetic 2000 --save-baseline baseline.json
+    python replay.py --synthetic 2000 --baseline baseline.json
+    python replay.py --corpus conversations.jsonl --baseline baseline.json
+
+Corpus lines look like {"id": "c1", "turns": ["I need a laptop", "about $900"]}.
+Turns are flushed, never committed, and each conversation is rolled back
+when it ends. A synthetic conversation costs about 7 ms on one core, and
+--workers splits the corpus across processes.
+Exits with status 1 when a threshold is exceeded.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from database import Base, Product, SessionLocal, existing_columns
+from models import ChatMessage
+from chat_flow import run_chat_turn
+from demo_llm_service import DemoLLMService
+
+SYNTHETIC_OPENERS = ["I need a new laptop", "Looking for a laptop", "Can you help me pick a laptop?", "hi"]
+SYNTHETIC_PURPOSES = ["for gaming", "for school", "for office work", "for video editing", "for coding", "for browsing"]
+SYNTHETIC_BUDGETS = ["my budget is ${}", "around {} dollars", "under ${}"]
+SYNTHETIC_SPECS = ["{} GB RAM", "at least {}GB of RAM", "{}GB ssd", "{}gb storage"]
+SYNTHETIC_EXTRAS = ["something light and portable", "I like Asus", "Dell or HP is fine", "it should be powerful", "basic is fine"]
+
+def synthetic_corpus(count: int, seed: int = 7) -> List[Dict]:
+    rng = random.Random(seed)
+    conversations = []
+    for i in range(count):
+        turns = [rng.choice(SYNTHETIC_OPENERS), rng.choice(SYNTHETIC_PURPOSES)]
+        turns.append(rng.choice(SYNTHETIC_BUDGETS).format(rng.choice([400, 600, 800, 1000, 1300, 1800, 2600])))
+        spec = rng.choice(SYNTHETIC_SPECS)
+        turns.append(spec.format(rng.choice([8, 16, 32]) if "RAM" in spec else rng.choice([256, 512, 1000])))
+        turns.append(rng.choice(SYNTHETIC_EXTRAS))
+        tail = turns[1:]
+        rng.shuffle(tail)
+        turns[1:] = tail
+        conversations.append({"id": f"synthetic-{i}", "turns": turns})
+    return conversations
+
+def load_corpus(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def replay_database():
+    """In-memory database seeded with the configured product table"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    ReplaySession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    # Read only the columns the source has: older databases lack newer ones (e.g. price_minor),
+    # which Product's before_insert hook fills on the copy
+    source = SessionLocal()
+    target = ReplaySession()
+    try:
+        for row in source.execute(select(*existing_columns(Product.__table__))).mappings():
+            target.add(Product(**row))
+        target.commit()
+    finally:
+        source.close()
+    return target
+
+def _replay_chunk(conversations: List[Dict]):
+    db = replay_database()
+    llm = DemoLLMService()
+    results = {}
+    latencies = []
+    try:
+        for conversation in conversations:
+            session_id = f"replay-{conversation['id']}"
+            turns_to_recommendation: Optional[int] = None
+            recommended: List[int] = []
+            for turn_number, text in enumerate(conversation["turns"], start=1):
+                start = time.perf_counter()
+                # Flush only: nothing outlives the conversation, so per-turn commits are wasted work
+                response = run_chat_turn(db, ChatMessage(message=text, session_id=session_id),
+                                         llm_service=llm, commit=False)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.recommended_products:
+                    turns_to_recommendation = turn_number
+                    recommended = [p["id"] for p in response.recommended_products]
+                    break
+            # Discard the conversation's sessions and turns so the database stays at catalog size
+            db.rollback()
+            results[conversation["id"]] = {
+                "turns_to_recommendation": turns_to_recommendation,
+                "recommended": recommended,
+            }
+    finally:
+        db.close()
+    return results, latencies
+
+def replay(conversations: List[Dict], workers: int = 1) -> Dict:
+    """Replay conversations, split across worker processes each with its own in-memory database"""
+    if workers <= 1:
+        chunks = [_replay_chunk(conversations)]
+    else:
+        size = -(-len(conversations) // workers)
+        with multiprocessing.Pool(workers) as pool:
+            chunks = pool.map(_replay_chunk, [conversations[i:i + size] for i in range(0, len(conversations), size)])
+    results, latencies = {}, []
+    for chunk_results, chunk_latencies in chunks:
+        results.update(chunk_results)
+        latencies.extend(chunk_latencies)
+    return {"conversations": results, "summary": summarize(results, latencies)}
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def summarize(results: Dict, latencies: List[float]) -> Dict:
+    reached = [r["turns_to_recommendation"] for r in results.values() if r["turns_to_recommendation"]]
+    return {
+        "conversations": len(results),
+        "recommendation_rate": len(reached) / len(results) if results else 0.0,
+        "mean_turns_to_recommendation": statistics.mean(reached) if reached else None,
+        "turns": len(latencies),
+        "latency_p50_ms": _percentile(latencies, 0.5),
+        "latency_p95_ms": _percentile(latencies, 0.95),
+    }
+
+def overlap(current: Dict, baseline: Dict) -> float:
+    """Mean Jaccard overlap of recommended product ids for conversations in both runs"""
+    scores = []
+    for conversation_id, result in current["conversations"].items():
+        previous = baseline["conversations"].get(conversation_id)
+        if previous is None:
+            continue
+        a, b = set(result["recommended"]), set(previous["recommended"])
+        scores.append(1.0 if not a and not b else len(a & b) / len(a | b))
+    return statistics.mean(scores) if scores else 1.0
+
+def check_regressions(current: Dict, baseline: Dict, args) -> List[str]:
+    failures = []
+    now, before = current["summary"], baseline["summary"]
+    if now["mean_turns_to_recommendation"] and before["mean_turns_to_recommendation"]:
+        limit = before["mean_turns_to_recommendation"] * (1 + args.max_turns_increase)
+        if now["mean_turns_to_recommendation"] > limit:
+            failures.append(f"mean turns-to-recommendation {now['mean_turns_to_recommendation']:.2f} > {limit:.2f}")
+    if now["recommendation_rate"] < before["recommendation_rate"] - args.max_rate_drop:
+        failures.append(f"recommendation rate {now['recommendation_rate']:.1%} dropped from {before['recommendation_rate']:.1%}")
+    score = overlap(current, baseline)
+    if score < args.min_overlap:
+        failures.append(f"recommendation overlap {score:.2f} < {args.min_overlap:.2f}")
+    latency_limit = before["latency_p95_ms"] * (1 + args.max_latency_increase)
+    if now["latency_p95_ms"] > max(latency_limit, args.latency_floor_ms):
+        failures.append(f"p95 turn latency {now['latency_p95_ms']:.2f}ms > {latency_limit:.2f}ms")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="JSONL file of recorded conversations")
+    parser.add_argument("--synthetic", type=int, default=0, help="number of synthetic conversations to add")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="replay processes")
+    parser.add_argument("--baseline", help="compare against this baseline JSON")
+    parser.add_argument("--save-baseline", help="write this run as a baseline JSON")
+    parser.add_argument("--max-turns-increase", type=float, default=0.10, help="allowed relative increase")
+    parser.add_argument("--max-rate-drop", type=float, default=0.02, help="allowed absolute drop")
+    parser.add_argument("--min-overlap", type=float, default=0.80)
+    parser.add_argument("--max-latency-increase", type=float, default=0.50, help="allowed relative p95 increase")
+    parser.add_argument("--latency-floor-ms", type=float, default=5.0, help="ignore p95 regressions below this")
+    args = parser.parse_args()
+
+    conversations = load_corpus(args.corpus) if args.corpus else []
+    if args.synthetic:
+        conversations += synthetic_corpus(args.synthetic, args.seed)
+    if not conversations:
+        parser.error("nothing to replay: pass --corpus and/or --synthetic")
+
+    start = time.perf_counter()
+    current = replay(conversations, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    print(json.dumps(current["summary"], indent=2))
+    print(f"Replayed {len(conversations)} conversations in {elapsed:.2f}s")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f)
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Recommendation overlap with baseline: {overlap(current, baseline):.2f}")
+        failures = check_regressions(current, baseline, args)
+        for failure in failures:
+            print(f"REGRESSION: {failure}")
+        if failures:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional
+
+class CircuitOpenError(Exception):
+    """Raised without calling upstream while the circuit breaker is open"""
+
+class DeadlineExceededError(Exception):
+    """Raised when an upstream call does not finish within its deadline"""
+
+class CircuitBreaker:
+    """Open after repeated slow or failed calls, then probe again after a cool-down.
+
+    closed    -> calls go through; consecutive failures are counted
+    open      -> calls are rejected immediately until reset_timeout has passed
+    half_open -> one probe call is let through; success closes, failure re-opens
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 slow_call_threshold: Optional[float] = None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.slow_call_threshold = slow_call_threshold
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self, latency: float):
+        if self.slow_call_threshold is not None and latency > self.slow_call_threshold:
+            self.record_failure()
+            return
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"Circuit breaker opened after {self.failures} slow or failed calls")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+class ResilientModel:
+    """Wrap a model's generate_content with a deadline, circuit breaker and optional hedging.
+
+    Abandoned calls (timed out or beaten by a hedge) keep running in the pool
+    but their results are discarded. They are still billed upstream, so
+    last_attempts reports how many requests the calling thread's most recent
+    generate_content sent (2 when it hedged).
+    """
+
+    def __init__(self, model, deadline: float = 8.0, breaker: Optional[CircuitBreaker] = None,
+                 hedge_after: Optional[float] = None, max_workers: int = 8):
+        self.model = model
+        self.deadline = deadline
+        self.breaker = breaker or CircuitBreaker(slow_call_threshold=deadline)
+        self.hedge_after = hedge_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-call")
+        self._local = threading.local()
+
+    @property
+    def last_attempts(self) -> int:
+        return getattr(self._local, "attempts", 0)
+
+    def generate_content(self, prompt: str):
+        self._local.attempts = 0
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        start = time.monotonic()
+        futures = [self._executor.submit(self.model.generate_content, prompt)]
+        try:
+            result = self._wait_first(prompt, futures, start)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        finally:
+            self._local.attempts = len(futures)
+        self.breaker.record_success(time.monotonic() - start)
+        return result
+
+    def _wait_first(self, prompt: str, futures, start: float):
+        if self.hedge_after is not None and self.hedge_after < self.deadline:
+            done, _ = wait(futures, timeout=self.hedge_after)
+            if not done:
+                # Hedge: race a second identical call against the slow first one
+                futures.append(self._executor.submit(self.model.generate_content, prompt))
+        pending = list(futures)
+        last_error = None
+        while pending:
+            remaining = self.deadline - (time.monotonic() - start)
+            if remaining <= 0:
+                break
+            done, not_done = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                last_error = future.exception()
+            pending = list(not_done)
+        if last_error is not None and not pending:
+            raise last_error
+        raise DeadlineExceededError(f"LLM call exceeded {self.deadline:.1f}s deadline")
+
+def resilient_model_from_env(model) -> ResilientModel:
+    """Build a ResilientModel using LLM_* environment settings"""
+    deadline = float(os.getenv("LLM_DEADLINE_SECONDS", "8"))
+    hedge_after = os.getenv("LLM_HEDGE_AFTER_SECONDS")
+    breaker = CircuitBreaker(
+        failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "3")),
+        reset_timeout=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30")),
+        slow_call_threshold=float(os.getenv("LLM_SLOW_CALL_SECONDS", str(deadline)))
+    )
+    return ResilientModel(
+        model,
+        deadline=deadline,
+        breaker=breaker,
+        hedge_after=float(hedge_after) if hedge_after else None
+    )
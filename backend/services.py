@@ -1,126 +1,143 @@
-from sqlalchemy.orm import Session
-from database import Product, ChatSession
-from models import SlotMemory, ProductResponse
-from typing import List, Dict, Any
-from datetime import datetime
-import json
-
-class ProductService:
-    def __init__(self, db: Session):
-        self.db = db
-    
-    def search_products(self, memory: SlotMemory) -> List[ProductResponse]:
-        """Search products based on filled memory slots"""
-        query = self.db.query(Product)
-        
-        # Apply filters based on memory
-        if memory.budget:
-            query = query.filter(Product.price <= memory.budget)
-            
-        if memory.ram:
-            query = query.filter(Product.ram >= memory.ram)
-            
-        if memory.storage:
-            query = query.filter(Product.storage >= memory.storage)
-            
-        if memory.purpose:
-            query = query.filter(Product.use_case.like(f"%{memory.purpose}%"))
-            
-        if memory.category:
-            query = query.filter(Product.category == memory.category)
-            
-        if memory.brand_preference:
-            query = query.filter(Product.brand.like(f"%{memory.brand_preference}%"))
-            
-        if memory.weight_preference:
-            if memory.weight_preference == "light":
-                query = query.filter(Product.weight <= 1.5)
-            elif memory.weight_preference == "medium":
-                query = query.filter(Product.weight.between(1.5, 2.5))
-            elif memory.weight_preference == "heavy":
-                query = query.filter(Product.weight >= 2.5)
-                
-        if memory.screen_size:
-            if memory.screen_size == "small":
-                query = query.filter(Product.screen_size <= 13)
-            elif memory.screen_size == "medium":
-                query = query.filter(Product.screen_size.between(14, 15))
-            elif memory.screen_size == "large":
-                query = query.filter(Product.screen_size >= 16)
-        
-        if memory.upgradability:
-            if "ram" in memory.upgradability.lower():
-                query = query.filter(Product.upgradable_ram == True)
-            if "storage" in memory.upgradability.lower():
-                query = query.filter(Product.upgradable_storage == True)
-        
-        # Order by relevance (you can customize this)
-        query = query.order_by(Product.price.asc())
-        
-        # Limit results
-        products = query.limit(5).all()
-        
-        return [ProductResponse(
-            id=p.id,
-            name=p.name,
-            category=p.category,
-            price=p.price,
-            ram=p.ram,
-            storage=p.storage,
-            weight=p.weight,
-            screen_size=p.screen_size,
-            processor=p.processor,
-            graphics=p.graphics,
-            battery_life=p.battery_life,
-            use_case=p.use_case,
-            upgradable_ram=p.upgradable_ram,
-            upgradable_storage=p.upgradable_storage,
-            description=p.description,
-            image_url=p.image_url,
-            brand=p.brand
-        ) for p in products]
-
-class SessionService:
-    def __init__(self, db: Session):
-        self.db = db
-    
-    def get_or_create_session(self, session_id: str) -> SlotMemory:
-        """Get existing session memory or create new one"""
-        session = self.db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
-        
-        if session:
-            return SlotMemory.parse_obj(json.loads(session.memory))
-        else:
-            # Create new session
-            new_memory = SlotMemory()
-            session = ChatSession(
-                session_id=session_id,
-                memory=json.dumps(new_memory.dict()),
-                created_at=str(datetime.now()),
-                updated_at=str(datetime.now())
-            )
-            self.db.add(session)
-            self.db.commit()
-            return new_memory
-    
-    def update_session(self, session_id: str, memory: SlotMemory):
-        """Update session memory"""
-        session = self.db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
-        if session:
-            session.memory = json.dumps(memory.dict())
-            session.updated_at = str(datetime.now())
-            self.db.commit()
-    
-    def should_recommend_products(self, memory: SlotMemory) -> bool:
-        """Check if we have enough information to recommend products"""
-        filled_slots = 0
-        total_important_slots = 6
-        
-        if memory.budget is not None: filled_slots += 1
-        if memory.purpose is not None: filled_slots += 1
-        if memory.ram is not None: filled_slots += 1
-        if memory.storage is not None: filled_slots += 1
-        if len(memory.properties) > 0: filled_slots += 1
-        if memory.performance_needs is not None: filled_slots += 1
-        
-        return filled_slots / total_important_slots >= 0.6  # 60% threshold
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from database import ChatSession, ChatTurn
+from models import SlotMemory, ProductResponse
+from catalog import product_catalog
+from facets import RECOMMEND_CANDIDATE_THRESHOLD, get_facet_engine
+from currency import budget_minor
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta
+import json
+import os
+
+class ProductService:
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def search_products(self, memory: SlotMemory, limit: int = 5) -> List[ProductResponse]:
+        """Search the in-memory catalog (snapshot or product table) based on filled memory slots"""
+        products, version = product_catalog.current(self.db)
+        # Same filters the facet engine counts with, so counts and results always agree
+        facet_engine = get_facet_engine(products, version)
+        mask = facet_engine.candidates(memory)
+
+        # Order by price (you can customize this)
+        return [products[i] for i in facet_engine.cheapest(mask, limit)]
+
+# Sessions idle for longer than this are treated as new and removed by the sweeper
+SESSION_TTL = timedelta(minutes=int(os.getenv("SESSION_TTL_MINUTES", "1440")))
+
+def dump_memory(memory: SlotMemory) -> str:
+    """Compact JSON holding only the slots that differ from their defaults"""
+    return json.dumps(memory.dict(exclude_defaults=True), separators=(",", ":"))
+
+def load_memory(payload: str) -> SlotMemory:
+    memory = SlotMemory.parse_obj(json.loads(payload)) if payload else SlotMemory()
+    if memory.budget is not None and memory.budget_minor is None:
+        # Stored before budgets were converted on update
+        memory.budget_minor = budget_minor(memory.budget)
+    return memory
+
+def _expired(session: ChatSession) -> bool:
+    return session.updated_at is not None and session.updated_at < datetime.now() - SESSION_TTL
+
+class SessionService:
+    def __init__(self, db: Session, commit: bool = True):
+        self.db = db
+        # commit=False only flushes, leaving the transaction to the caller (see replay.py)
+        self.commit = commit
+        # Rows already loaded by this (per-request) service, so a turn looks each session up once
+        self._rows: Dict[str, ChatSession] = {}
+
+    def _row(self, session_id: str) -> Optional[ChatSession]:
+        session = self._rows.get(session_id)
+        if session is None:
+            session = self.db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
+            if session is not None:
+                self._rows[session_id] = session
+        return session
+
+    def _save(self):
+        if self.commit:
+            self.db.commit()
+        else:
+            self.db.flush()
+    
+    def peek_session(self, session_id: str) -> Tuple[SlotMemory, bool]:
+        """Current memory and whether the session has real history (filled slots or turns); never writes"""
+        session = self.db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
+        if session is None or _expired(session):
+            return SlotMemory(), False
+        memory = load_memory(session.memory)
+        if memory.dict(exclude_defaults=True):
+            return memory, True
+        has_turns = self.db.query(ChatTurn.id).filter(ChatTurn.session_id == session_id).first() is not None
+        return memory, has_turns
+
+    def get_or_create_session(self, session_id: str) -> SlotMemory:
+        """Get existing session memory or create new one"""
+        session = self._row(session_id)
+        
+        if session:
+            if _expired(session):
+                # Expired but not swept yet: start over rather than resurrect stale slots or turns
+                self._restart_session(session)
+                return SlotMemory()
+            return load_memory(session.memory)
+        else:
+            # Create new session
+            new_memory = SlotMemory()
+            now = datetime.now()
+            session = ChatSession(
+                session_id=session_id,
+                memory=dump_memory(new_memory),
+                created_at=now,
+                updated_at=now
+            )
+            self.db.add(session)
+            try:
+                self._save()
+                self._rows[session_id] = session
+            except IntegrityError:
+                # A concurrent request created the same session first
+                self.db.rollback()
+                session = self.db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
+                return load_memory(session.memory)
+            return new_memory
+    
+    def _restart_session(self, session: ChatSession):
+        self.db.query(ChatTurn).filter(ChatTurn.session_id == session.session_id).delete(synchronize_session=False)
+        now = datetime.now()
+        session.memory = dump_memory(SlotMemory())
+        session.summary = None
+        session.summarized_through = 0
+        session.created_at = now
+        session.updated_at = now
+        self._save()
+
+    def update_session(self, session_id: str, memory: SlotMemory):
+        """Update session memory"""
+        session = self._row(session_id)
+        if session:
+            session.memory = dump_memory(memory)
+            session.updated_at = datetime.now()
+            self._save()
+    
+    def should_recommend_products(self, memory: SlotMemory, candidate_count: Optional[int] = None) -> bool:
+        """Check if we have enough information to recommend products"""
+        if candidate_count is not None and 0 < candidate_count <= RECOMMEND_CANDIDATE_THRESHOLD \
+                and memory.dict(exclude_defaults=True):
+            # Few enough matches left that another question would not narrow things usefully
+            return True
+
+        filled_slots = 0
+        total_important_slots = 6
+        
+        if memory.budget is not None: filled_slots += 1
+        if memory.purpose is not None: filled_slots += 1
+        if memory.ram is not None: filled_slots += 1
+        if memory.storage is not None: filled_slots += 1
+        if len(memory.properties) > 0: filled_slots += 1
+        if memory.performance_needs is not None: filled_slots += 1
+        
+        return filled_slots / total_important_slots >= 0.6  # 60% threshold
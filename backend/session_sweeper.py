@@ -0,0 +1,69 @@
+import asyncio
+import os
+from datetime import datetime
+from starlette.concurrency import run_in_threadpool
+from database import SessionLocal, ChatSession, ChatTurn
+from services import SESSION_TTL
+
+class SessionSweeper:
+    """Background task that deletes expired chat sessions in small batches"""
+
+    def __init__(self, interval_seconds: float = 300.0, batch_size: int = 500):
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.deleted_total = 0
+        self._task = None
+
+    def sweep_once(self) -> int:
+        """Delete sessions idle longer than SESSION_TTL; returns the number removed"""
+        cutoff = datetime.now() - SESSION_TTL
+        deleted = 0
+        db = SessionLocal()
+        try:
+            while True:
+                # Batch by primary key so each transaction (and lock) stays short
+                rows = (db.query(ChatSession.id, ChatSession.session_id)
+                        .filter(ChatSession.updated_at < cutoff)
+                        .limit(self.batch_size)
+                        .all())
+                if not rows:
+                    break
+                ids = [row.id for row in rows]
+                db.query(ChatTurn).filter(ChatTurn.session_id.in_([row.session_id for row in rows])).delete(synchronize_session=False)
+                db.query(ChatSession).filter(ChatSession.id.in_(ids)).delete(synchronize_session=False)
+                db.commit()
+                deleted += len(ids)
+                if len(ids) < self.batch_size:
+                    break
+        finally:
+            db.close()
+        self.deleted_total += deleted
+        if deleted:
+            print(f"Session sweeper removed {deleted} expired sessions")
+        return deleted
+
+    async def _run(self):
+        while True:
+            try:
+                await run_in_threadpool(self.sweep_once)
+            except Exception as e:
+                print(f"Error in session sweeper: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+session_sweeper = SessionSweeper(
+    interval_seconds=float(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", "300")),
+    batch_size=int(os.getenv("SESSION_SWEEP_BATCH_SIZE", "500"))
+)
@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English prompts)"""
+    return max(1, len(text) // 4) if text else 0
+
+class TokenBucket:
+    """Classic token bucket; a capacity of 0 means unlimited"""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self.refill_per_second = tokens_per_minute / 60.0
+        self.tokens = float(tokens_per_minute)
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def has(self, amount: int) -> bool:
+        if not self.capacity:
+            return True
+        self._refill()
+        return self.tokens >= amount
+
+    def consume(self, amount: int):
+        # May go negative: output tokens are only known after the call
+        if self.capacity:
+            self._refill()
+            self.tokens -= amount
+
+def _empty_totals() -> Dict[str, float]:
+    return {"calls": 0, "input_tokens": 0, "output_tokens": 0, "latency_ms": 0.0,
+            "cache_hits": 0, "errors": 0, "throttled": 0, "short_circuited": 0, "hedged": 0}
+
+class UsageTracker:
+    """Per-session and global LLM token accounting with budget enforcement.
+
+    State is in-process: with WEB_CONCURRENCY workers each worker enforces its
+    own copy of every budget, so the effective global limit is the configured
+    one times the worker count (and a session's budget likewise, when its
+    requests land on different workers).
+    """
+
+    def __init__(self, session_token_budget: int = 0, session_tokens_per_minute: int = 0,
+                 global_tokens_per_minute: int = 0, max_sessions: int = 10000):
+        self.session_token_budget = session_token_budget
+        self.session_tokens_per_minute = session_tokens_per_minute
+        self.max_sessions = max_sessions
+        self.global_totals = _empty_totals()
+        self.global_bucket = TokenBucket(global_tokens_per_minute)
+        # session_id -> (totals, bucket); LRU-bounded so idle sessions age out
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _session(self, session_id: str):
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = (_empty_totals(), TokenBucket(self.session_tokens_per_minute))
+            self._sessions[session_id] = entry
+            if len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return entry
+
+    def allow(self, session_id: Optional[str], estimated_tokens: int) -> bool:
+        """Whether a call with this many input tokens fits the session and global budgets"""
+        with self._lock:
+            allowed = self.global_bucket.has(estimated_tokens)
+            if session_id is not None:
+                totals, bucket = self._session(session_id)
+                spent = totals["input_tokens"] + totals["output_tokens"]
+                if self.session_token_budget and spent + estimated_tokens > self.session_token_budget:
+                    allowed = False
+                if not bucket.has(estimated_tokens):
+                    allowed = False
+                if not allowed:
+                    totals["throttled"] += 1
+            if not allowed:
+                self.global_totals["throttled"] += 1
+            return allowed
+
+    def record(self, session_id: Optional[str], input_tokens: int, output_tokens: int,
+               latency_ms: float, cached: bool = False, error: bool = False, attempts: int = 1):
+        """Record one LLM call (or a cache hit when cached=True).
+
+        attempts > 1 means the call was hedged: every request sent upstream is
+        counted and its prompt charged; output is only known for the winner.
+        """
+        input_tokens *= attempts
+        with self._lock:
+            targets = [self.global_totals]
+            if session_id is not None:
+                totals, bucket = self._session(session_id)
+                targets.append(totals)
+                if not cached:
+                    bucket.consume(input_tokens + output_tokens)
+            if not cached:
+                self.global_bucket.consume(input_tokens + output_tokens)
+            for totals in targets:
+                if cached:
+                    totals["cache_hits"] += 1
+                    continue
+                totals["calls"] += attempts
+                totals["hedged"] += attempts - 1
+                totals["input_tokens"] += input_tokens
+                totals["output_tokens"] += output_tokens
+                totals["latency_ms"] += latency_ms
+                if error:
+                    totals["errors"] += 1
+
+    def record_short_circuit(self, session_id: Optional[str]):
+        """Count a call refused by the open circuit breaker; nothing was sent, so no tokens are charged"""
+        with self._lock:
+            self.global_totals["short_circuited"] += 1
+            if session_id is not None:
+                self._session(session_id)[0]["short_circuited"] += 1
+
+    def session_stats(self, session_id: str) -> Dict[str, float]:
+        with self._lock:
+            totals = self._sessions.get(session_id, (_empty_totals(), None))[0]
+            return dict(totals)
+
+    def global_stats(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self.global_totals, tracked_sessions=len(self._sessions))
+
+# Budgets are per worker process (see UsageTracker)
+usage_tracker = UsageTracker(
+    session_token_budget=int(os.getenv("SESSION_TOKEN_BUDGET", "0")),
+    session_tokens_per_minute=int(os.getenv("SESSION_TOKENS_PER_MINUTE", "0")),
+    global_tokens_per_minute=int(os.getenv("GLOBAL_TOKENS_PER_MINUTE", "0"))
+)
@@ -0,0 +1,42 @@
+import time
+from typing import Dict
+from database import create_tables, SessionLocal
+from catalog import product_catalog
+from facets import get_facet_engine
+from llm_provider import get_llm_service
+
+def warm_up() -> Dict[str, float]:
+    """Do the one-off startup work before the worker accepts traffic.
+
+    Creates tables, resolves the LLM provider (configuring the Gemini SDK if
+    a key is set), preloads the product catalog and builds its facet engine
+    and fuzzy index. Returns per-step timings in milliseconds.
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    create_tables()
+    timings["create_tables"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    service = get_llm_service()
+    # Touch the model so the SDK import/configure happens now, not on the first chat
+    getattr(service, "model", None)
+    timings["llm_provider"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        product_count = product_catalog.load(db)
+        timings["product_catalog"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        # The first chat turn would otherwise build these under the engine lock
+        get_facet_engine(*product_catalog.current(db))
+        timings["facet_engine"] = (time.perf_counter() - start) * 1000
+    finally:
+        db.close()
+
+    print(f"Warm-up done: {product_count} products, " +
+          ", ".join(f"{k}={v:.1f}ms" for k, v in timings.items()))
+    return timings
@@ -163,3 +163,72 @@ df.write.jdbc(
 
 
 # %%
+
+
+# %%
+# Write the memory-mapped product snapshot the backend workers serve from
+import sys
+from pyspark.sql.functions import lit, row_number
+from pyspark.sql.window import Window
+
+BACKEND_DIR = "/media/nghia/G3 Plus/Work/Chatbot for selling product/chatbot-system/backend"
+sys.path.append(BACKEND_DIR)
+from product_snapshot import write_snapshot, is_servable
+from currency import to_minor, price_bucket
+
+# One id per laptop, shared by the snapshot, the products table and product_details
+df_ids = df.select("laptop_id").withColumn("product_id", row_number().over(Window.orderBy("laptop_id")))
+
+df_snapshot = (
+    df.join(df_ids, "laptop_id")
+    .withColumnRenamed("product_id", "id")
+    .select(
+        "id",
+        col("product_name").alias("name"),
+        lit("laptop").alias("category"),
+        "price",
+        col("ram_capacity").alias("ram"),
+        col("storage_size_gb").alias("storage"),
+        "weight",
+        "screen_size",
+        col("cpu_type").alias("processor"),
+        col("gpu_type").alias("graphics"),
+        "brand",
+        # Not in the scraped specs; the backend's column defaults only apply to ORM inserts
+        lit(False).alias("upgradable_ram"),
+        lit(False).alias("upgradable_storage"),
+    )
+)
+
+# Rows without a name or price cannot be served; leave them out of both the snapshot and products
+snapshot_rows = [row.asDict() for row in df_snapshot.collect() if is_servable(row.asDict())]
+for row in snapshot_rows:
+    # Scraped prices are VND; store the canonical integer price and its bucket once here
+    row["price_minor"] = to_minor(row["price"], "VND")
+    row["price_bucket"] = price_bucket(row["price_minor"])
+snapshot_version = write_snapshot(f"{BACKEND_DIR}/products.snapshot", snapshot_rows)
+print(f"Wrote {len(snapshot_rows)} products to snapshot version {snapshot_version}")
+
+# Same rows and ids into the products table (truncate keeps the backend's schema and indexes).
+# product_details references products, so the truncate cascades to it; it is rewritten below.
+# Its prices are VND, so run the backend with PRODUCT_CURRENCY=VND.
+spark.createDataFrame(snapshot_rows).write.jdbc(
+    url=pg_url,
+    table="products",
+    mode="overwrite",
+    properties={**pg_properties, "truncate": "true", "cascadeTruncate": "true"}
+)
+
+
+# %%
+# Long spec text goes to its own table; the backend loads it lazily by product id
+# (same ids as the snapshot above) for the /products/compare endpoint
+df_details = df_textual.join(df_ids, "laptop_id").drop("laptop_id", "product_name")
+
+df_details.write.jdbc(
+    url=pg_url,
+    table="product_details",
+    mode="overwrite",
+    # Keep the backend's table and its foreign key to products
+    properties={**pg_properties, "truncate": "true"}
+)
@@ -0,0 +1,252 @@
+# ingest_pipeline.py
+"""
+Sharded, multi-retailer ingestion: split -> normalize (process pool) -> dedupe -> merge.
+
+Each retailer CSV is read in chunks, every chunk is normalized in a worker
+process with that retailer's column map, and rows describing the same laptop
+at different retailers are merged by a canonical model key. Throughput is
+reported per stage.
+
+    python ingest_pipeline.py --input cellphones=../laptop_specs.csv --out ../catalog.csv
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.append(BACKEND_DIR)
+from currency import CANONICAL_CURRENCY, to_minor
+
+# Vietnamese spec labels used by cellphones.com.vn (same mapping as etl_python.py)
+CELLPHONES_COLUMNS = {
+    "laptop_id": "laptop_id",
+    "product_name": "product_name",
+    "price": "price",
+    "link": "link",
+    "Loại card đồ họa": "gpu_type",
+    "Dung lượng RAM": "ram_capacity",
+    "Loại RAM": "ram_type",
+    "Số khe ram": "ram_slots",
+    "Ổ cứng": "storage",
+    "Kích thước màn hình": "screen_size",
+    "Công nghệ màn hình": "screen_tech",
+    "Pin": "battery",
+    "Hệ điều hành": "os",
+    "Độ phân giải màn hình": "screen_resolution",
+    "Loại CPU": "cpu_type",
+    "Cổng giao tiếp": "ports",
+    "Tần số quét": "refresh_rate",
+    "Chất liệu tấm nền": "panel_material",
+    "Công nghệ âm thanh": "audio_tech",
+    "Tính năng đặc biệt": "special_features",
+    "Loại đèn bàn phím": "keyboard_light",
+    "Bảo mật": "security",
+    "Webcam": "webcam",
+    "Kích thước": "dimensions",
+    "Trọng lượng": "weight",
+    "Wi-Fi": "wifi",
+    "Bluetooth": "bluetooth",
+    "Khe đọc thẻ nhớ": "card_reader",
+    "Chất liệu": "material",
+    "Chất liệu vỏ trên": "upper_case_material",
+    "Chất liệu vỏ dưới": "lower_case_material",
+    "Chất liệu vỏ màn hình": "screen_case_material",
+    "Loại màn hình": "screen_type",
+    "Hãng sản xuất": "brand",
+    "Nguồn": "power",
+    "Chip AI": "ai_chip",
+}
+
+# Per-retailer settings; add an entry (and its column map) to onboard a new retailer
+RETAILERS = {
+    "cellphones": {"columns": CELLPHONES_COLUMNS, "currency": "VND"},
+}
+
+# Words that do not identify a model and vary between retailers' listings
+MODEL_STOPWORDS = {"laptop", "gaming", "notebook", "may", "tinh", "xach", "tay", "chinh", "hang"}
+
+# Normalized brand token -> display name; names often lead with a word like "Gaming", so brands are matched, not assumed
+KNOWN_BRANDS = {
+    "asus": "Asus", "lenovo": "Lenovo", "hp": "HP", "acer": "Acer", "dell": "Dell", "msi": "MSI",
+    "lg": "LG", "gigabyte": "Gigabyte", "masstel": "Masstel", "apple": "Apple", "samsung": "Samsung",
+    "microsoft": "Microsoft", "huawei": "Huawei", "xiaomi": "Xiaomi",
+}
+# Product-line words that identify the brand on their own
+BRAND_ALIASES = {"macbook": "apple", "mac": "apple", "imac": "apple", "macmini": "apple"}
+
+NUMERIC_FIELDS = ["price", "ram_capacity", "storage_size_gb", "screen_size", "weight", "refresh_rate"]
+
+def _strip_accents(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).replace("đ", "d").replace("Đ", "D")
+
+def _first_number(value, pattern=r"(\d+\.?\d*)"):
+    if not isinstance(value, str):
+        return None
+    match = re.search(pattern, value.replace(",", "."))
+    return float(match.group(1)) if match else None
+
+def parse_price(value):
+    # "21.490.000đ" -> 21490000
+    if not isinstance(value, str):
+        return None
+    digits = re.sub(r"[^0-9]", "", value)
+    return int(digits) if digits else None
+
+def parse_storage_gb(value):
+    # "512GB PCIe ..." -> 512, "1TB SSD" -> 1000
+    if not isinstance(value, str):
+        return None
+    match = re.search(r"(\d+)\s*(gb|tb)", value.lower())
+    if not match:
+        return None
+    size = int(match.group(1))
+    return size * 1000 if match.group(2) == "tb" else size
+
+def parse_panel(value):
+    if not isinstance(value, str):
+        return None
+    match = re.search(r"(ips|sva|va|tn|oled|pl|wva)", value.lower())
+    return match.group(1) if match else None
+
+def _tokens(text) -> list:
+    return re.sub(r"[^a-z0-9]+", " ", _strip_accents(text or "").lower()).split()
+
+def detect_brand(brand, product_name):
+    """Normalized brand from the brand field, else the first known brand (or alias) in the name"""
+    for token in _tokens(brand) + _tokens(product_name):
+        token = BRAND_ALIASES.get(token, token)
+        if token in KNOWN_BRANDS:
+            return token
+    return None
+
+def model_key(brand, product_name) -> str:
+    """Canonical key for the same laptop across retailers: brand plus identifying name tokens"""
+    brand_norm = detect_brand(brand, product_name) or ""
+    tokens = [t for t in _tokens(product_name)
+              if BRAND_ALIASES.get(t, t) != brand_norm and t not in MODEL_STOPWORDS]
+    return f"{brand_norm}|{'-'.join(tokens)}"
+
+def normalize_chunk(retailer: str, records):
+    """Normalize one chunk of raw rows for a retailer (runs in a worker process)"""
+    columns = RETAILERS[retailer]["columns"]
+    rows = []
+    for raw in records:
+        row = {canonical: raw.get(source) for source, canonical in columns.items()}
+        for key, value in row.items():
+            if isinstance(value, float) and pd.isna(value):
+                row[key] = None
+            elif isinstance(value, str):
+                row[key] = value.strip() or None
+
+        row["price"] = parse_price(row.get("price"))
+        row["ram_capacity"] = _first_number(row.get("ram_capacity"), r"(\d+)")
+        row["storage_size_gb"] = parse_storage_gb(row.get("storage"))
+        row["screen_size"] = _first_number(row.get("screen_size"))
+        row["weight"] = _first_number(row.get("weight"))
+        row["refresh_rate"] = _first_number(row.get("refresh_rate"), r"(\d+)")
+        row["panel_material"] = parse_panel(row.get("panel_material"))
+        brand = detect_brand(row.get("brand"), row.get("product_name"))
+        row["brand"] = KNOWN_BRANDS[brand] if brand else row.get("brand")
+
+        row["retailer"] = retailer
+        row["currency"] = RETAILERS[retailer]["currency"]
+        # Retailers price in different currencies; offers are only comparable in canonical minor units
+        row["price_minor"] = to_minor(row["price"], row["currency"])
+        row["model_key"] = model_key(row.get("brand"), row.get("product_name"))
+        rows.append(row)
+    return rows
+
+# Added by dedupe; not part of a listing's completeness
+MERGE_FIELDS = {"retailers", "offers", "min_price_minor", "canonical_currency"}
+
+def _completeness(row) -> int:
+    return sum(value is not None for key, value in row.items() if key not in MERGE_FIELDS)
+
+def dedupe(rows):
+    """Merge rows sharing a model_key: keep the most complete listing, the lowest price and all retailers"""
+    merged = {}
+    for row in rows:
+        key = row["model_key"]
+        current = merged.get(key)
+        if current is None:
+            merged[key] = dict(row, retailers=row["retailer"], offers=1, min_price_minor=row["price_minor"],
+                               canonical_currency=CANONICAL_CURRENCY)
+            continue
+        best = row if _completeness(row) > _completeness(current) else current
+        prices = [p for p in (current["min_price_minor"], row["price_minor"]) if p is not None]
+        retailers = sorted(set(current["retailers"].split(",")) | {row["retailer"]})
+        merged[key] = dict(best, retailers=",".join(retailers), offers=current["offers"] + 1,
+                           min_price_minor=min(prices) if prices else None, canonical_currency=CANONICAL_CURRENCY)
+    return list(merged.values())
+
+class StageTimer:
+    def __init__(self):
+        self.stages = []
+
+    def record(self, name, rows, seconds):
+        self.stages.append((name, rows, seconds))
+
+    def report(self):
+        print(f"{'stage':<12}{'rows':>10}{'seconds':>10}{'rows/s':>12}")
+        for name, rows, seconds in self.stages:
+            rate = rows / seconds if seconds > 0 else float("inf")
+            print(f"{name:<12}{rows:>10}{seconds:>10.2f}{rate:>12.0f}")
+
+def run_pipeline(inputs, out_path, chunk_size=5000, workers=None):
+    timer = StageTimer()
+
+    # Split: stream every retailer file into fixed-size chunks
+    start = time.perf_counter()
+    chunks = []
+    for retailer, path in inputs:
+        if retailer not in RETAILERS:
+            raise ValueError(f"Unknown retailer '{retailer}', add it to RETAILERS")
+        for frame in pd.read_csv(path, chunksize=chunk_size, dtype=str, encoding="utf-8-sig"):
+            chunks.append((retailer, frame.to_dict("records")))
+    raw_rows = sum(len(records) for _, records in chunks)
+    timer.record("split", raw_rows, time.perf_counter() - start)
+
+    # Normalize: one task per chunk across the process pool
+    start = time.perf_counter()
+    normalized = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rows in pool.map(normalize_chunk, *zip(*chunks)) if chunks else []:
+            normalized.extend(rows)
+    timer.record("normalize", len(normalized), time.perf_counter() - start)
+
+    # Dedupe: collapse the same laptop listed by several retailers
+    start = time.perf_counter()
+    catalog = dedupe(normalized)
+    timer.record("dedupe", len(catalog), time.perf_counter() - start)
+
+    # Merge: write the unified catalog
+    start = time.perf_counter()
+    pd.DataFrame(catalog).to_csv(out_path, index=False, encoding="utf-8-sig")
+    timer.record("merge", len(catalog), time.perf_counter() - start)
+
+    timer.report()
+    print(f"{raw_rows} input rows -> {len(catalog)} unique laptops written to {out_path}")
+    return catalog
+
+def _parse_input(value):
+    retailer, _, path = value.partition("=")
+    if not path:
+        raise argparse.ArgumentTypeError("expected retailer=path.csv")
+    return retailer, path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", type=_parse_input, action="append", required=True,
+                        help="retailer=path.csv (repeat for each retailer)")
+    parser.add_argument("--out", default="catalog.csv")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    run_pipeline(args.input, args.out, args.chunk_size, args.workers)